@@ -20,7 +20,10 @@ load_dotenv(dotenv_path=env_path)
 
 config = context.config
 
-if config.config_file_name is not None:
+# Set when the app migrates in-process (app.migrations); leave its logging alone.
+provided_connection: Connection | None = config.attributes.get("connection")
+
+if config.config_file_name is not None and provided_connection is None:
     fileConfig(config.config_file_name)
 
 
@@ -94,6 +97,8 @@ async def run_migrations_online() -> None:
 
 if context.is_offline_mode():
     run_migrations_offline()
+elif provided_connection is not None:
+    do_run_migrations(provided_connection)
 else:
     asyncio.run(run_migrations_online())
 
@@ -0,0 +1,28 @@
+"""index vehicles on (created_at, vin) for pagination
+
+Revision ID: 0002_vehicles_created_at_vin
+Revises: 0001_create_vehicles
+Create Date: 2026-10-17
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_vehicles_created_at_vin"
+down_revision = "0001_create_vehicles"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_vehicles_created_at_vin",
+        "vehicles",
+        [sa.text("created_at DESC"), sa.text("vin DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vehicles_created_at_vin", table_name="vehicles")
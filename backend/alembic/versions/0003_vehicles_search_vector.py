@@ -0,0 +1,45 @@
+"""add full-text search vector to vehicles
+
+Revision ID: 0003_vehicles_search_vector
+Revises: 0002_vehicles_created_at_vin
+Create Date: 2026-10-17
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003_vehicles_search_vector"
+down_revision = "0002_vehicles_created_at_vin"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "vehicles",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', make), 'A') || "
+                "setweight(to_tsvector('english', model), 'A') || "
+                "setweight(to_tsvector('english', description), 'B')",
+                persisted=True,
+            ),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_vehicles_search_vector",
+        "vehicles",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vehicles_search_vector", table_name="vehicles")
+    op.drop_column("vehicles", "search_vector")
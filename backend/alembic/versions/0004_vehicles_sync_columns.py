@@ -0,0 +1,76 @@
+"""track content hash, update time and soft deletes on vehicles
+
+Revision ID: 0004_vehicles_sync_columns
+Revises: 0003_vehicles_search_vector
+Create Date: 2026-10-17
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_vehicles_sync_columns"
+down_revision = "0003_vehicles_search_vector"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("vehicles", sa.Column("content_hash", sa.Text(), nullable=True))
+    op.add_column(
+        "vehicles",
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+    )
+    op.add_column("vehicles", sa.Column("deleted_at", sa.TIMESTAMP(timezone=True), nullable=True))
+    op.execute(
+        "UPDATE vehicles SET "
+        "content_hash = md5(ROW(make, model, description, image_urls)::text), "
+        "updated_at = created_at"
+    )
+
+    # Hashing in the database keeps every write path (API, bulk, seeder, sync)
+    # consistent with the hash the feed sync computes for staged rows.
+    op.execute(
+        """
+        CREATE FUNCTION vehicles_set_content_hash() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.content_hash := md5(ROW(NEW.make, NEW.model, NEW.description, NEW.image_urls)::text);
+            IF TG_OP = 'UPDATE' THEN
+                NEW.updated_at := now();
+            END IF;
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER vehicles_set_content_hash
+        BEFORE INSERT OR UPDATE ON vehicles
+        FOR EACH ROW EXECUTE FUNCTION vehicles_set_content_hash()
+        """
+    )
+
+    op.drop_index("ix_vehicles_created_at_vin", table_name="vehicles")
+    op.create_index(
+        "ix_vehicles_created_at_vin",
+        "vehicles",
+        [sa.text("created_at DESC"), sa.text("vin DESC")],
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vehicles_created_at_vin", table_name="vehicles")
+    op.create_index(
+        "ix_vehicles_created_at_vin",
+        "vehicles",
+        [sa.text("created_at DESC"), sa.text("vin DESC")],
+    )
+    op.execute("DROP TRIGGER vehicles_set_content_hash ON vehicles")
+    op.execute("DROP FUNCTION vehicles_set_content_hash()")
+    op.drop_column("vehicles", "deleted_at")
+    op.drop_column("vehicles", "updated_at")
+    op.drop_column("vehicles", "content_hash")
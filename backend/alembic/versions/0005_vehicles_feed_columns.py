@@ -0,0 +1,70 @@
+"""store the feed's numeric and descriptive columns on vehicles
+
+Revision ID: 0005_vehicles_feed_columns
+Revises: 0004_vehicles_sync_columns
+Create Date: 2026-10-17
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_vehicles_feed_columns"
+down_revision = "0004_vehicles_sync_columns"
+branch_labels = None
+depends_on = None
+
+_INTEGER_COLUMNS = ("year", "price", "mileage")
+_TEXT_COLUMNS = ("trim", "exterior_color", "interior_color", "fuel_type", "transmission")
+
+_HASH_FUNCTION = """
+    CREATE OR REPLACE FUNCTION vehicles_set_content_hash() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.content_hash := md5(ROW({columns})::text);
+        IF TG_OP = 'UPDATE' THEN
+            NEW.updated_at := now();
+        END IF;
+        RETURN NEW;
+    END
+    $$
+"""
+
+_OLD_HASHED = ("make", "model", "description", "image_urls")
+_NEW_HASHED = (*_OLD_HASHED, *_INTEGER_COLUMNS, *_TEXT_COLUMNS)
+
+_INDEXES = {
+    "ix_vehicles_price": ["price"],
+    "ix_vehicles_mileage": ["mileage"],
+    "ix_vehicles_year": ["year"],
+    "ix_vehicles_make_model_year": ["make", "model", "year"],
+    "ix_vehicles_fuel_type_price": ["fuel_type", "price"],
+}
+
+
+def _set_hash_columns(columns: tuple[str, ...]) -> None:
+    op.execute(_HASH_FUNCTION.format(columns=", ".join(f"NEW.{name}" for name in columns)))
+    # Rehash existing rows without bumping updated_at, so the next feed sync
+    # only rewrites vehicles whose content actually differs.
+    op.execute("ALTER TABLE vehicles DISABLE TRIGGER vehicles_set_content_hash")
+    op.execute(f"UPDATE vehicles SET content_hash = md5(ROW({', '.join(columns)})::text)")
+    op.execute("ALTER TABLE vehicles ENABLE TRIGGER vehicles_set_content_hash")
+
+
+def upgrade() -> None:
+    for name in _INTEGER_COLUMNS:
+        op.add_column("vehicles", sa.Column(name, sa.Integer(), nullable=True))
+    for name in _TEXT_COLUMNS:
+        op.add_column("vehicles", sa.Column(name, sa.Text(), nullable=True))
+    _set_hash_columns(_NEW_HASHED)
+    for index_name, columns in _INDEXES.items():
+        op.create_index(index_name, "vehicles", columns, postgresql_where=sa.text("deleted_at IS NULL"))
+
+
+def downgrade() -> None:
+    for index_name in _INDEXES:
+        op.drop_index(index_name, table_name="vehicles")
+    _set_hash_columns(_OLD_HASHED)
+    for name in reversed((*_INTEGER_COLUMNS, *_TEXT_COLUMNS)):
+        op.drop_column("vehicles", name)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import csv
+import io
+import zlib
+from collections.abc import AsyncIterator
+from enum import Enum
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.queries.vehicle_queries import (
+    CONTENT_COLUMNS,
+    VehicleFilters,
+    build_export_vehicles_stmt,
+    vehicle_row_to_dict,
+)
+from app.serialization import dump_vehicle_details
+
+EXPORT_COLUMNS = ("vin", *CONTENT_COLUMNS, "created_at")
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        return "application/x-ndjson" if self is ExportFormat.NDJSON else "text/csv"
+
+
+def _ndjson_lines(rows: list[Any]) -> bytes:
+    return b"".join(body + b"\n" for body in dump_vehicle_details(rows))
+
+
+def _csv_lines(rows: list[Any], *, header: bool) -> bytes:
+    """CSV with API field names, so an export can be fed straight back to ``POST /bulk``."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        item = vehicle_row_to_dict(row)
+        item["image_urls"] = ",".join(item["image_urls"])
+        item["created_at"] = item["created_at"].isoformat() if item["created_at"] else ""
+        writer.writerow(["" if item[name] is None else item[name] for name in EXPORT_COLUMNS])
+    return buffer.getvalue().encode("utf-8")
+
+
+async def iter_vehicle_export(
+    engine: AsyncEngine,
+    *,
+    fmt: ExportFormat,
+    filters: VehicleFilters,
+    batch_size: int,
+    gzip: bool,
+) -> AsyncIterator[bytes]:
+    """Yield the encoded export one server-side cursor batch at a time.
+
+    Rows are fetched ``batch_size`` at a time from a named cursor, so memory
+    stays flat regardless of table size and the first batch is sent while
+    Postgres is still producing the rest. With ``gzip`` each batch is
+    sync-flushed, so the client can decompress as the bytes arrive.
+    """
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+    first = True
+    async with engine.connect() as conn:
+        result = await conn.stream(
+            build_export_vehicles_stmt(filters).execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            chunk = _ndjson_lines(rows) if fmt is ExportFormat.NDJSON else _csv_lines(rows, header=first)
+            first = False
+            if compressor is not None:
+                chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield chunk
+    if fmt is ExportFormat.CSV and first:
+        header = _csv_lines([], header=True)
+        yield compressor.compress(header) if compressor is not None else header
+    if compressor is not None:
+        yield compressor.flush()
@@ -0,0 +1,254 @@
+"""Inventory change notifications shared by every worker, over Postgres LISTEN/NOTIFY.
+
+Writers call :func:`publish` inside their own transaction, so a notification
+goes out exactly when the write commits and never for a rollback. Each worker
+holds one dedicated asyncpg connection that listens on the channel and fans
+every event out to local handlers (dropping cached pages, details and the
+cached total) and to ``GET /api/vehicles/stream`` subscribers.
+
+LISTEN needs a session, so the listener cannot go through a transaction
+pooler such as PgBouncer; ``CHANGE_FEED_DATABASE_URL`` can point it at a
+direct or session-pooled address instead. Publishing works through either.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import asyncpg
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db import PoolMode, PoolSettings
+from app.queries.vehicle_queries import VEHICLE_CHANGES_CHANNEL, build_notify_vehicle_changes_stmt
+from app.response_cache import get_vehicle_cache
+from app.vehicle_count import get_vehicle_counter
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process, so it can skip work it already did when it wrote.
+ORIGIN = uuid.uuid4().hex[:12]
+
+# NOTIFY payloads are capped at 8000 bytes; larger VIN lists are sent as a count.
+MAX_PAYLOAD_VINS = 100
+
+CREATED = "created"  # API creates; ``vins`` lists them
+INSERTED = "inserted"  # bulk loads and seeding; only ``count`` is known
+SYNCED = "synced"  # feed sync updated or soft-deleted rows
+RESYNC = "resync"  # events may have been missed; refetch everything
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    op: str
+    vins: tuple[str, ...] = ()
+    count: int = 0
+    origin: str = ""
+
+    def to_json(self) -> str:
+        return json.dumps({"op": self.op, "vins": list(self.vins), "count": self.count, "origin": self.origin})
+
+    @classmethod
+    def from_json(cls, payload: str) -> ChangeEvent:
+        data = json.loads(payload)
+        return cls(
+            op=str(data["op"]),
+            vins=tuple(data.get("vins") or ()),
+            count=int(data.get("count") or 0),
+            origin=str(data.get("origin") or ""),
+        )
+
+    def to_sse(self) -> bytes:
+        """One Server-Sent Events message; the origin stays internal."""
+        data = json.dumps({"op": self.op, "vins": list(self.vins), "count": self.count})
+        event = "resync" if self.op == RESYNC else "vehicles"
+        return f"event: {event}\ndata: {data}\n\n".encode()
+
+
+async def publish(conn: AsyncConnection, op: str, *, vins: Iterable[str] = (), count: int | None = None) -> None:
+    """Notify every worker of a change, when ``conn``'s transaction commits."""
+    vins = tuple(vins)
+    count = len(vins) if count is None else count
+    if len(vins) > MAX_PAYLOAD_VINS:
+        vins = ()
+    event = ChangeEvent(op, vins, count, ORIGIN)
+    await conn.execute(build_notify_vehicle_changes_stmt(event.to_json()))
+
+
+def invalidate_local_state(event: ChangeEvent) -> None:
+    """Drop what this process cached about vehicles another process changed."""
+    if event.origin == ORIGIN:
+        # The writer already invalidated, right after its commit.
+        return
+    get_vehicle_counter().invalidate()
+    cache = get_vehicle_cache()
+    if event.op in (CREATED, INSERTED):
+        # New rows only shift list pages, plus details of any VIN revived by a create.
+        cache.invalidate_vehicles(list(event.vins))
+    else:
+        cache.clear()
+
+
+def _listener_dsn(database_url: str) -> str:
+    """``database_url`` in the plain form asyncpg accepts (no SQLAlchemy driver suffix)."""
+    return database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+class ChangeFeed:
+    """One LISTEN connection per process, fanned out to handlers and subscriber queues.
+
+    A lost connection is re-established with backoff. Notifications sent
+    while it was down are gone, so reconnecting dispatches a ``resync``
+    event: handlers drop everything and stream clients refetch. A subscriber
+    that falls ``queue_size`` events behind gets the same treatment rather
+    than slowing everyone else down.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        keepalive: float = 30.0,
+        heartbeat: float = 15.0,
+        max_stream_seconds: float = 300.0,
+        queue_size: int = 100,
+        max_reconnect_delay: float = 30.0,
+    ) -> None:
+        self.dsn = dsn
+        self.keepalive = keepalive
+        self.heartbeat = heartbeat
+        self.max_stream_seconds = max_stream_seconds
+        self.queue_size = queue_size
+        self.max_reconnect_delay = max_reconnect_delay
+        self.handlers: list[Callable[[ChangeEvent], None]] = []
+        self.connected = False
+        self.connections = 0
+        self.received = 0
+        self.overflows = 0
+        self.last_error: str | None = None
+        self._subscribers: set[asyncio.Queue[ChangeEvent]] = set()
+        self._task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_env(cls, settings: PoolSettings) -> ChangeFeed | None:
+        """A feed unless ``CHANGE_FEED_ENABLED`` is off or only a transaction pooler is available."""
+        if os.getenv("CHANGE_FEED_ENABLED", "true").strip().lower() in {"0", "false", "no", "off"}:
+            return None
+        url = os.getenv("CHANGE_FEED_DATABASE_URL", "").strip()
+        if not url:
+            url = os.getenv("DATABASE_URL", "")
+            if settings.resolve_mode(url) is PoolMode.PGBOUNCER:
+                logger.warning(
+                    "Change feed disabled: LISTEN does not work through a transaction pooler; "
+                    "set CHANGE_FEED_DATABASE_URL to a direct or session-mode address"
+                )
+                return None
+        return cls(
+            _listener_dsn(url),
+            heartbeat=float(os.getenv("CHANGE_FEED_HEARTBEAT", "15")),
+            max_stream_seconds=float(os.getenv("CHANGE_FEED_MAX_STREAM_SECONDS", "300")),
+            queue_size=int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "100")),
+        )
+
+    def subscribe(self) -> asyncio.Queue[ChangeEvent]:
+        queue: asyncio.Queue[ChangeEvent] = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[ChangeEvent]) -> None:
+        self._subscribers.discard(queue)
+
+    def dispatch(self, event: ChangeEvent) -> None:
+        for handler in self.handlers:
+            try:
+                handler(event)
+            except Exception:  # noqa: BLE001
+                logger.exception("Change feed handler failed for %s", event.op)
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.overflows += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(ChangeEvent(RESYNC))
+
+    def _on_notify(self, conn: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = ChangeEvent.from_json(payload)
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed change notification: %r", payload[:200])
+            return
+        self.received += 1
+        self.dispatch(event)
+
+    async def _listen_once(self) -> None:
+        conn = await asyncpg.connect(self.dsn, server_settings={"application_name": "vehicle-change-feed"})
+        lost = asyncio.Event()
+        conn.add_termination_listener(lambda _conn: lost.set())
+        try:
+            await conn.add_listener(VEHICLE_CHANGES_CHANNEL, self._on_notify)
+            self.connected = True
+            self.last_error = None
+            self.connections += 1
+            if self.connections > 1:
+                self.dispatch(ChangeEvent(RESYNC))
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), self.keepalive)
+                except asyncio.TimeoutError:
+                    # A half-open TCP connection never reports termination; a round trip does.
+                    await asyncio.wait_for(conn.execute("SELECT 1"), 5)
+            raise ConnectionError("listener connection closed")
+        finally:
+            self.connected = False
+            if not conn.is_closed():
+                conn.terminate()
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while True:
+            connections = self.connections
+            try:
+                await self._listen_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                if self.connections > connections:
+                    # It had been up, so this is a fresh outage rather than a retry.
+                    delay = 1.0
+                self.last_error = str(exc) or type(exc).__name__
+                logger.warning("Change feed listener lost (%s); reconnecting in %.0fs", self.last_error, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": True,
+            "connected": self.connected,
+            "connections": self.connections,
+            "received": self.received,
+            "subscribers": len(self._subscribers),
+            "overflows": self.overflows,
+            "last_error": self.last_error,
+        }
+
+
+def get_change_feed(request: Request) -> ChangeFeed | None:
+    """The app's change feed, or None when it is disabled."""
+    return getattr(request.app.state, "change_feed", None)
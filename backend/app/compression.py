@@ -0,0 +1,203 @@
+"""Brotli or gzip encoding of JSON and text responses.
+
+Only bodies the app sends in one piece are compressed, and only from
+``COMPRESSION_MIN_SIZE`` bytes up: below that the headers outweigh the
+saving. Streams pass through untouched, since buffering would hold back the
+change feed's events and the export already gzips itself batch by batch.
+Images and other already-compressed media types are never re-encoded.
+
+The encoded bytes differ from the identity body, so a strong ``ETag`` is
+sent weak (as nginx does); ``If-None-Match`` uses weak comparison, so
+revalidation still ends in a ``304``. Bodies that carry an ETag are usually
+served from the response cache, so their encoded form is memoized by URL,
+ETag and encoding, and a cache hit is not compressed again.
+
+Brotli is used when the ``brotli`` package is installed and the client
+accepts it; otherwise gzip.
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+from collections import OrderedDict
+from typing import Any
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Text-like types worth compressing; text/event-stream is a stream and never arrives whole.
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def negotiate_encoding(accept_encoding: str, *, brotli_available: bool = brotli is not None) -> str | None:
+    """The best of ``br`` and ``gzip`` that ``Accept-Encoding`` allows, or None for identity.
+
+    Higher ``q`` wins and brotli wins ties; ``*`` covers codings not named.
+    """
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+
+    best, best_quality = None, 0.0
+    for name in ("br", "gzip") if brotli_available else ("gzip",):
+        quality = qualities.get(name, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class Compressor:
+    """Encoding settings, the memo of encoded bodies and counters for ``/debug/compression``."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        min_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        memo_entries: int = 256,
+    ) -> None:
+        self.enabled = enabled
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.memo_entries = memo_entries
+        self._memo: OrderedDict[tuple[Any, ...], bytes] = OrderedDict()
+        self.responses = {"br": 0, "gzip": 0}
+        self.memo_hits = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @classmethod
+    def from_env(cls) -> Compressor:
+        return cls(
+            enabled=os.getenv("COMPRESSION_ENABLED", "true").strip().lower() not in {"0", "false", "no", "off"},
+            min_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+            gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+            brotli_quality=int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+            memo_entries=int(os.getenv("COMPRESSION_MEMO_ENTRIES", "256")),
+        )
+
+    def encode(self, body: bytes, encoding: str, memo_key: tuple[Any, ...] | None = None) -> bytes:
+        """``body`` in ``encoding``, reusing the memoized bytes for ``memo_key``."""
+        if memo_key is not None and (encoded := self._memo.get(memo_key)) is not None:
+            self._memo.move_to_end(memo_key)
+            self.memo_hits += 1
+        else:
+            if encoding == "br":
+                encoded = brotli.compress(body, quality=self.brotli_quality)
+            else:
+                # mtime=0 keeps the output identical for identical input.
+                encoded = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+            if memo_key is not None and self.memo_entries > 0:
+                self._memo[memo_key] = encoded
+                if len(self._memo) > self.memo_entries:
+                    self._memo.popitem(last=False)
+        self.responses[encoding] += 1
+        self.bytes_in += len(body)
+        self.bytes_out += len(encoded)
+        return encoded
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "brotli_available": brotli is not None,
+            "min_size": self.min_size,
+            "responses": dict(self.responses),
+            "memo_entries": len(self._memo),
+            "memo_hits": self.memo_hits,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+
+def _compressible(headers: MutableHeaders) -> bool:
+    if "content-encoding" in headers:
+        return False
+    media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+    return media_type != "text/event-stream" and media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """ASGI middleware encoding whole JSON and text bodies as negotiated by ``Accept-Encoding``.
+
+    The response start is held back until the first body message shows
+    whether the body is complete; a streamed body is passed on unchanged.
+    """
+
+    def __init__(self, app: Any, compressor: Compressor) -> None:
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self.compressor.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start: dict[str, Any] | None = None
+        passthrough = False
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+
+            passthrough = True
+            assert start is not None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if message.get("more_body", False) or len(body) < self.compressor.min_size or not _compressible(headers):
+                await send(start)
+                await send(message)
+                return
+
+            # The body depends on Accept-Encoding even when this client gets it uncompressed.
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None:
+                etag = headers.get("etag")
+                memo_key = None
+                if etag is not None and not etag.startswith("W/"):
+                    if start["status"] == 200:
+                        memo_key = (scope["path"], scope["query_string"], etag, encoding)
+                    headers["etag"] = f"W/{etag}"
+                body = self.compressor.encode(body, encoding, memo_key)
+                headers["content-encoding"] = encoding
+                headers["content-length"] = str(len(body))
+                message = {**message, "body": body}
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+_compressor: Compressor | None = None
+
+
+def get_compressor() -> Compressor:
+    global _compressor
+    if _compressor is None:
+        _compressor = Compressor.from_env()
+    return _compressor
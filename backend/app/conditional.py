@@ -0,0 +1,132 @@
+"""ETags, Last-Modified and ``Cache-Control`` for the vehicle read endpoints.
+
+Validators are computed from data the database already keeps, so a
+revalidation can be answered with ``304 Not Modified`` before any body is
+built:
+
+- A vehicle's version is its ``updated_at`` (bumped by the content-hash trigger on
+  every update, including soft deletes and re-listing) plus its
+  ``content_hash``; a primary-key lookup of those two columns is enough.
+- A list or search page is tagged with the MVCC snapshot it was read under
+  (``pg_current_snapshot()``) and the normalized query. Identical snapshots
+  see identical data, and the snapshot changes whenever a write transaction
+  starts or ends, so re-reading it is a one-row, no-table query.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from collections.abc import Hashable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import Request, Response, status
+
+# Bump when the JSON representation changes, so old ETags stop matching.
+REPRESENTATION_VERSION = "2"
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """A serialized response body with its validators."""
+
+    body: bytes
+    etag: str
+    last_modified: datetime | None = None
+
+
+@dataclass(frozen=True)
+class CachePolicies:
+    """``Cache-Control`` values per route."""
+
+    detail: str = "no-cache"
+    list: str = "no-cache"
+    search: str = "no-cache"
+
+    @classmethod
+    def from_env(cls) -> CachePolicies:
+        return cls(
+            detail=os.getenv("CACHE_CONTROL_DETAIL", "no-cache").strip(),
+            list=os.getenv("CACHE_CONTROL_LIST", "no-cache").strip(),
+            search=os.getenv("CACHE_CONTROL_SEARCH", "no-cache").strip(),
+        )
+
+
+def row_etag(row: Any, fields: tuple[str, ...] | None = None) -> str:
+    """Strong ETag for a vehicle row selected with its version columns, whole or as ``fields``."""
+    micros = int(row.updated_at.timestamp() * 1_000_000)
+    tag = f"{REPRESENTATION_VERSION}-{row.content_hash[:16]}-{micros:x}"
+    if fields is not None:
+        # Each fieldset is its own representation of the row.
+        tag += "-" + hashlib.blake2b(",".join(fields).encode(), digest_size=4).hexdigest()
+    return f'"{tag}"'
+
+
+def snapshot_etag(snapshot: str, key: Hashable) -> str:
+    """Strong ETag for a page of ``key`` read under MVCC ``snapshot``."""
+    digest = hashlib.blake2b(f"{REPRESENTATION_VERSION}|{snapshot}|{key!r}".encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def has_validators(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    """Whether the client's cached copy is current (RFC 9110 section 13.1.2 and 13.1.3).
+
+    ``If-None-Match`` uses weak comparison and, when present, takes precedence
+    over ``If-Modified-Since``.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution.
+    return last_modified.replace(microsecond=0) <= since
+
+
+def validator_headers(etag: str, last_modified: datetime | None, cache_control: str) -> dict[str, str]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def not_modified_response(etag: str, last_modified: datetime | None, cache_control: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validator_headers(etag, last_modified, cache_control))
+
+
+def conditional_json_response(request: Request, cached: CachedBody, cache_control: str) -> Response:
+    """``304`` if the client already has ``cached``, else the body with its validators."""
+    if is_not_modified(request, cached.etag, cached.last_modified):
+        return not_modified_response(cached.etag, cached.last_modified, cache_control)
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers=validator_headers(cached.etag, cached.last_modified, cache_control),
+    )
+
+
+_policies: CachePolicies | None = None
+
+
+def get_cache_policies() -> CachePolicies:
+    global _policies
+    if _policies is None:
+        _policies = CachePolicies.from_env()
+    return _policies
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import asyncio
 import os
 from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from enum import Enum
 from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 from dotenv import load_dotenv
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 # Load environment variables from .env file
 env_path = Path(__file__).parent.parent / ".env"
@@ -21,8 +27,109 @@ def _get_database_url() -> str:
     return database_url
 
 
-def create_engine() -> AsyncEngine:
-    database_url = _get_database_url()
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that reports how long each checkout took to its ``checkout_observers``."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkout_observers: list[Callable[[float], None]] = []
+
+    def _do_get(self) -> Any:
+        if not self.checkout_observers:
+            return super()._do_get()
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = perf_counter() - started
+            for observer in self.checkout_observers:
+                observer(elapsed)
+
+
+class PoolMode(str, Enum):
+    DIRECT = "direct"
+    PGBOUNCER = "pgbouncer"
+    AUTO = "auto"
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    raw = os.getenv(name, "").strip().lower()
+    if not raw:
+        return default
+    return raw in {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Connection pool and driver options for :func:`create_engine`.
+
+    ``direct`` keeps asyncpg's prepared-statement caches, which saves a parse
+    and plan on every repeated query. ``pgbouncer`` turns them off, because a
+    transaction-pooled server connection can change between statements.
+    ``auto`` picks ``pgbouncer`` for Supabase pooler hosts and port 6543.
+    """
+
+    mode: PoolMode = PoolMode.AUTO
+    size: int = 5
+    max_overflow: int = 10
+    timeout: float = 30.0
+    recycle: int = -1
+    pre_ping: bool = True
+    warmup: int = 0
+    statement_cache_size: int = 100
+
+    @classmethod
+    def from_env(cls) -> PoolSettings:
+        raw_mode = os.getenv("DB_POOL_MODE", PoolMode.AUTO.value).strip().lower()
+        try:
+            mode = PoolMode(raw_mode)
+        except ValueError as exc:
+            choices = ", ".join(item.value for item in PoolMode)
+            raise RuntimeError(f"DB_POOL_MODE must be one of: {choices}.") from exc
+        size = int(os.getenv("DB_POOL_SIZE", "5"))
+        return cls(
+            mode=mode,
+            size=size,
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            recycle=int(os.getenv("DB_POOL_RECYCLE", "-1")),
+            pre_ping=_env_flag("DB_POOL_PRE_PING", True),
+            warmup=int(os.getenv("DB_POOL_WARMUP", str(size))),
+            statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100")),
+        )
+
+    def resolve_mode(self, database_url: str) -> PoolMode:
+        if self.mode is not PoolMode.AUTO:
+            return self.mode
+        parsed = urlparse(database_url)
+        if parsed.port == 6543 or ".pooler." in (parsed.hostname or ""):
+            return PoolMode.PGBOUNCER
+        return PoolMode.DIRECT
+
+    def engine_kwargs(self, database_url: str) -> dict[str, Any]:
+        if self.resolve_mode(database_url) is PoolMode.PGBOUNCER:
+            cache_size = 0
+        else:
+            cache_size = self.statement_cache_size
+        return {
+            "poolclass": TimedQueuePool,
+            "pool_size": self.size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.timeout,
+            "pool_recycle": self.recycle,
+            "pool_pre_ping": self.pre_ping,
+            "connect_args": {
+                # asyncpg's own cache, and SQLAlchemy's adapter-level one.
+                "statement_cache_size": cache_size,
+                "prepared_statement_cache_size": cache_size,
+            },
+        }
+
+
+def create_engine(settings: PoolSettings | None = None, *, database_url: str | None = None) -> AsyncEngine:
+    """Engine for ``database_url`` (``DATABASE_URL`` by default) with ``settings`` applied."""
+    database_url = database_url or _get_database_url()
+    settings = settings or PoolSettings.from_env()
 
     # Convert to asyncpg scheme
     if database_url.startswith("postgres://"):
@@ -41,13 +148,43 @@ def create_engine() -> AsyncEngine:
         parsed._replace(query=urlencode(query_items, doseq=True))
     )
 
-    return create_async_engine(database_url, pool_pre_ping=True)
+    return create_async_engine(database_url, **settings.engine_kwargs(database_url))
 
 
-async def get_db_conn(request: Request) -> AsyncIterator[AsyncConnection]:
+async def warm_pool(engine: AsyncEngine, connections: int) -> int:
+    """Open ``connections`` pooled connections concurrently, then return them to the pool.
+
+    Capped at ``pool_size``, since the pool closes returned overflow
+    connections instead of keeping them. Returns how many were opened.
+    """
+    pool_size = getattr(engine.pool, "size", None)
+    if pool_size is not None:
+        connections = min(connections, pool_size())
+    if connections <= 0:
+        return 0
+    opened = await asyncio.gather(
+        *(engine.connect().start() for _ in range(connections)),
+        return_exceptions=True,
+    )
+    failures = [item for item in opened if isinstance(item, BaseException)]
+    for conn in opened:
+        if isinstance(conn, AsyncConnection):
+            await conn.close()
+    if failures:
+        raise failures[0]
+    return connections
+
+
+def get_db_engine(request: Request) -> AsyncEngine:
+    """Return the app engine for handlers that only connect when they need to."""
     engine: AsyncEngine | None = getattr(request.app.state, "engine", None)
     if engine is None:
         raise RuntimeError("Database engine is not initialized.")
+    return engine
+
+
+async def get_db_conn(request: Request) -> AsyncIterator[AsyncConnection]:
+    engine = get_db_engine(request)
 
     async with engine.connect() as conn:
         yield conn
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _parse_sample_rates(raw: str) -> dict[str, float]:
+    """Parse ``"event=rate,*=rate"`` into a mapping; ``*`` is the default rate."""
+    rates: dict[str, float] = {}
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise RuntimeError(f"EVENT_LOG_SAMPLE_RATES entry {item!r} must look like name=rate.")
+        rate = float(value)
+        if not 0.0 <= rate <= 1.0:
+            raise RuntimeError(f"EVENT_LOG_SAMPLE_RATES rate for {name.strip()!r} must be between 0 and 1.")
+        rates[name.strip()] = rate
+    return rates
+
+
+class EventLogger:
+    """Structured JSON-lines event log written off the event loop.
+
+    :meth:`emit` only samples the event and puts it on a bounded queue; a
+    daemon thread serializes and appends queued events in batches. When the
+    queue is full events are dropped (and counted) instead of blocking the
+    caller. A logger without a path is disabled and :meth:`emit` returns
+    immediately.
+    """
+
+    def __init__(
+        self,
+        path: Path | None,
+        *,
+        sample_rates: dict[str, float] | None = None,
+        queue_size: int = 10_000,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.path = path
+        self.enabled = path is not None
+        self._sample_rates = dict(sample_rates or {})
+        self._default_rate = self._sample_rates.pop("*", 1.0)
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=queue_size)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    @classmethod
+    def from_env(cls) -> EventLogger:
+        raw_path = os.getenv("EVENT_LOG_PATH", "").strip()
+        return cls(
+            Path(raw_path) if raw_path else None,
+            sample_rates=_parse_sample_rates(os.getenv("EVENT_LOG_SAMPLE_RATES", "")),
+            queue_size=int(os.getenv("EVENT_LOG_QUEUE_SIZE", "10000")),
+            batch_size=int(os.getenv("EVENT_LOG_BATCH_SIZE", "256")),
+            flush_interval=float(os.getenv("EVENT_LOG_FLUSH_INTERVAL", "1.0")),
+        )
+
+    def sampled(self, event: str) -> bool:
+        """Return True if ``event`` should be recorded this time.
+
+        Callers with expensive payloads check this before building them.
+        """
+        if not self.enabled:
+            return False
+        rate = self._sample_rates.get(event, self._default_rate)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+    def emit(self, event: str, location: str, data: dict[str, Any] | None = None) -> None:
+        if not self.sampled(event):
+            return
+        self.write(event, location, data)
+
+    def write(self, event: str, location: str, data: dict[str, Any] | None = None) -> None:
+        """Enqueue an event that the caller has already sampled."""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((int(time.time() * 1000), event, location, data or {}))
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="event-log-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        assert self.path is not None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                stopping = True
+                batch = [item for item in batch if item is not _STOP]
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: list[Any]) -> None:
+        if not batch:
+            return
+        lines = [
+            json.dumps(
+                {"timestamp": ts, "event": event, "location": location, "data": data},
+                default=str,
+            )
+            for ts, event, location, data in batch
+        ]
+        try:
+            with self.path.open("a", encoding="utf-8") as handle:  # type: ignore[union-attr]
+                handle.write("\n".join(lines) + "\n")
+        except OSError:
+            logger.warning("Failed to write %d event log entries to %s", len(lines), self.path, exc_info=True)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued events and stop the writer thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        self._thread = None
+        if self.dropped:
+            logger.warning("Event log dropped %d event(s) because its queue was full", self.dropped)
+
+
+_event_logger: EventLogger | None = None
+
+
+def get_event_logger() -> EventLogger:
+    global _event_logger
+    if _event_logger is None:
+        _event_logger = EventLogger.from_env()
+    return _event_logger
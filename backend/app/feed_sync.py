@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    MetaData,
+    Table,
+    Text,
+    case,
+    cast,
+    func,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateTable, DropTable
+
+from app.bulk_ingest import STAGING_COLUMNS, iter_record_chunks
+from app.change_feed import SYNCED, publish
+from app.db import create_engine
+from app.queries.vehicle_queries import CONTENT_COLUMNS, is_active, vehicles_table
+
+logger = logging.getLogger(__name__)
+
+# Session-local work tables. Unlike the bulk-load staging table they keep
+# their rows across commits, so the diff can be applied in many short
+# transactions.
+_sync_metadata = MetaData()
+
+sync_staging_table = Table(
+    "vehicle_sync_staging",
+    _sync_metadata,
+    Column("vin", Text),
+    *(Column(name, vehicles_table.c[name].type) for name in CONTENT_COLUMNS),
+    prefixes=["TEMPORARY"],
+)
+
+sync_changes_table = Table(
+    "vehicle_sync_changes",
+    _sync_metadata,
+    Column("n", BigInteger),
+    Column("vin", Text),
+    Column("is_new", Boolean),
+    prefixes=["TEMPORARY"],
+)
+
+sync_removed_table = Table(
+    "vehicle_sync_removed",
+    _sync_metadata,
+    Column("n", BigInteger),
+    Column("vin", Text),
+    prefixes=["TEMPORARY"],
+)
+
+_WORK_TABLES = (sync_staging_table, sync_changes_table, sync_removed_table)
+
+
+def staged_content_hash() -> Any:
+    """Same hash the ``vehicles_set_content_hash`` trigger stores, computed for staged rows."""
+    staged = sync_staging_table.c
+    return func.md5(cast(tuple_(*(staged[name] for name in CONTENT_COLUMNS)), Text))
+
+
+def build_collect_changes_stmt() -> Any:
+    """Number the staged VINs that are new, changed, or currently soft-deleted."""
+    staged = sync_staging_table.c
+    current = vehicles_table.c
+    changed = (
+        select(staged.vin, current.vin.is_(None).label("is_new"))
+        .distinct(staged.vin)
+        .select_from(sync_staging_table.outerjoin(vehicles_table, current.vin == staged.vin))
+        .where(
+            current.vin.is_(None)
+            | current.deleted_at.is_not(None)
+            | current.content_hash.is_distinct_from(staged_content_hash())
+        )
+        .order_by(staged.vin)
+        .subquery()
+    )
+    return sync_changes_table.insert().from_select(
+        ["n", "vin", "is_new"],
+        select(func.row_number().over(order_by=changed.c.vin), changed.c.vin, changed.c.is_new),
+    )
+
+
+def build_collect_removed_stmt() -> Any:
+    """Number the live VINs that no longer appear in the feed."""
+    in_feed = select(sync_staging_table.c.vin).where(sync_staging_table.c.vin == vehicles_table.c.vin).exists()
+    return sync_removed_table.insert().from_select(
+        ["n", "vin"],
+        select(func.row_number().over(order_by=vehicles_table.c.vin), vehicles_table.c.vin).where(
+            is_active, ~in_feed
+        ),
+    )
+
+
+def build_apply_changes_stmt(*, first: int, last: int) -> Any:
+    staged = sync_staging_table.c
+    rows = (
+        select(*(staged[name] for name in STAGING_COLUMNS))
+        .distinct(staged.vin)
+        .join(sync_changes_table, sync_changes_table.c.vin == staged.vin)
+        .where(sync_changes_table.c.n.between(first, last))
+        .order_by(staged.vin)
+    )
+    stmt = pg_insert(vehicles_table).from_select(list(STAGING_COLUMNS), rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[vehicles_table.c.vin],
+        set_={
+            **{name: stmt.excluded[name] for name in CONTENT_COLUMNS},
+            # Re-listed vehicles count as new inventory, as in create_vehicle.
+            "created_at": case(
+                (vehicles_table.c.deleted_at.is_not(None), func.now()),
+                else_=vehicles_table.c.created_at,
+            ),
+            "deleted_at": None,
+        },
+    )
+
+
+def build_apply_removals_stmt(*, first: int, last: int) -> Any:
+    return (
+        update(vehicles_table)
+        .where(
+            vehicles_table.c.vin == sync_removed_table.c.vin,
+            sync_removed_table.c.n.between(first, last),
+            is_active,
+        )
+        .values(deleted_at=func.now())
+    )
+
+
+@dataclass
+class SyncResult:
+    received: int = 0
+    unchanged: int = 0
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    pending_deletes: int = 0
+    deletes_skipped: bool = False
+    elapsed: float = 0.0
+
+
+async def _stage_feed(conn: AsyncConnection, rows: Iterable[dict[str, Any]], chunk_size: int) -> int:
+    raw = await conn.get_raw_connection()
+    chunks = iter_record_chunks(rows, chunk_size)
+    received = 0
+    while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+        await raw.driver_connection.copy_records_to_table(
+            sync_staging_table.name,
+            records=chunk,
+            columns=STAGING_COLUMNS,
+        )
+        received += len(chunk)
+    return received
+
+
+async def sync_feed(
+    rows: Iterable[dict[str, Any]],
+    *,
+    chunk_size: int = 5000,
+    batch_size: int = 1000,
+    max_delete_fraction: float = 0.2,
+) -> SyncResult:
+    """Make ``vehicles`` match a full feed export while writing only what changed.
+
+    The feed is COPYed into a temporary table and diffed against the stored
+    content hashes in one set-based pass. New, changed and re-listed VINs are
+    then upserted, and live VINs missing from the feed are soft-deleted, each
+    in transactions of ``batch_size`` rows. Deletes are skipped when they
+    would remove more than ``max_delete_fraction`` of live inventory, which
+    usually means a truncated export rather than a mass sale.
+    """
+    engine = create_engine()
+    result = SyncResult()
+    started = time.perf_counter()
+    try:
+        async with engine.connect() as conn:
+            for work_table in _WORK_TABLES:
+                await conn.execute(DropTable(work_table, if_exists=True))
+                await conn.execute(CreateTable(work_table))
+            result.received = await _stage_feed(conn, rows, chunk_size)
+            await conn.exec_driver_sql(f"ANALYZE {sync_staging_table.name}")
+
+            await conn.execute(build_collect_changes_stmt())
+            await conn.execute(build_collect_removed_stmt())
+            summary = await conn.execute(
+                select(
+                    select(func.count()).select_from(sync_changes_table).scalar_subquery(),
+                    select(func.count())
+                    .select_from(sync_changes_table)
+                    .where(sync_changes_table.c.is_new)
+                    .scalar_subquery(),
+                    select(func.count()).select_from(sync_removed_table).scalar_subquery(),
+                    select(func.count(func.distinct(sync_staging_table.c.vin))).scalar_subquery(),
+                    select(func.count()).select_from(vehicles_table).where(is_active).scalar_subquery(),
+                )
+            )
+            changes, new, removed, distinct_vins, live = summary.one()
+            await conn.commit()
+
+            for first in range(1, changes + 1, batch_size):
+                applied = await conn.execute(build_apply_changes_stmt(first=first, last=first + batch_size - 1))
+                if applied.rowcount:
+                    await publish(conn, SYNCED, count=applied.rowcount)
+                await conn.commit()
+            result.inserted = new
+            result.updated = changes - new
+            result.unchanged = distinct_vins - changes
+
+            result.pending_deletes = removed
+            if removed and live and removed > max_delete_fraction * live:
+                result.deletes_skipped = True
+                logger.warning(
+                    "Feed is missing %d of %d live vehicles; skipping soft-deletes (limit %.0f%%)",
+                    removed,
+                    live,
+                    max_delete_fraction * 100,
+                )
+            else:
+                for first in range(1, removed + 1, batch_size):
+                    deleted = await conn.execute(build_apply_removals_stmt(first=first, last=first + batch_size - 1))
+                    result.deleted += deleted.rowcount or 0
+                    if deleted.rowcount:
+                        await publish(conn, SYNCED, count=deleted.rowcount)
+                    await conn.commit()
+
+            for work_table in _WORK_TABLES:
+                await conn.execute(DropTable(work_table, if_exists=True))
+            await conn.commit()
+    finally:
+        result.elapsed = time.perf_counter() - started
+        await engine.dispose()
+    return result
@@ -0,0 +1,376 @@
+"""Fetch, resize and cache vehicle photos for ``GET /api/images/{vin}/{index}``.
+
+Originals are fetched from the dealer's image host once, then stored with
+every resized variant in an :class:`ImageStore` on local disk. Resizing runs
+in a process pool (:mod:`app.image_resize`), so decoding a large JPEG never
+blocks the event loop, and concurrent misses for the same image share one
+fetch and one resize.
+
+Images are content-addressed: an original is stored under the SHA-256 of its
+bytes and a variant under that digest plus its width and quality, so
+listings that reuse a stock photo share one copy and ETags never need
+invalidating. A small ``ref-`` file maps each source URL to its digest.
+Originals are assumed not to change at a given URL.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import ipaddress
+import logging
+import multiprocessing
+import os
+import socket
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import urljoin, urlparse
+
+import httpx
+from fastapi import Request
+
+from app.image_resize import resize_to_jpeg
+from app.response_cache import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Requested widths snap up to one of these, so arbitrary ?w= values cannot fill the cache.
+VARIANT_WIDTHS = (160, 320, 480, 640, 800, 1200, 1600)
+
+MAX_REDIRECTS = 3
+
+# Only raster formats are served; anything else (SVG in particular) could run script on this origin.
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+class ImageFetchError(Exception):
+    """The original could not be fetched or is not a supported image."""
+
+
+def sniff_media_type(data: bytes) -> str | None:
+    for signature, media_type in _SIGNATURES:
+        if data.startswith(signature):
+            return media_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _read(path: Path) -> bytes | None:
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    # Record the use on disk too, so LRU order survives a restart.
+    os.utime(path)
+    return data
+
+
+def _write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as handle:
+        handle.write(data)
+    os.replace(handle.name, path)
+
+
+def _unlink(paths: list[Path]) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+def _scan(root: Path) -> list[tuple[str, int]]:
+    """Entries under ``root``, least recently used first."""
+    found = []
+    for path in root.glob("*/*"):
+        if path.is_file() and not path.name.startswith("tmp"):
+            stat = path.stat()
+            found.append((stat.st_mtime, path.name, stat.st_size))
+    found.sort()
+    return [(name, size) for _, name, size in found]
+
+
+class ImageStore:
+    """Files on disk, bounded by total size, evicted least recently used first.
+
+    File IO runs on threads; the index is only touched on the event loop.
+    Each worker process keeps its own index of the shared directory, so with
+    several workers the bound applies per worker, and a file another worker
+    evicted is simply a miss.
+    """
+
+    def __init__(self, root: Path, *, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()
+
+    def _path(self, name: str) -> Path:
+        # Names lead with a hex digest; its first two characters spread files over 256 directories.
+        return self.root / name.removeprefix("ref-")[:2] / name
+
+    async def load(self) -> None:
+        await asyncio.to_thread(self.root.mkdir, parents=True, exist_ok=True)
+        for name, size in await asyncio.to_thread(_scan, self.root):
+            self._entries[name] = size
+            self.bytes += size
+        await self._evict()
+
+    async def get(self, name: str) -> bytes | None:
+        data = await asyncio.to_thread(_read, self._path(name))
+        if data is None:
+            self.bytes -= self._entries.pop(name, 0)
+            self.misses += 1
+            return None
+        if name not in self._entries:
+            # Written by another worker.
+            self.bytes += len(data)
+        self._entries[name] = len(data)
+        self._entries.move_to_end(name)
+        self.hits += 1
+        return data
+
+    async def put(self, name: str, data: bytes) -> None:
+        await asyncio.to_thread(_write, self._path(name), data)
+        self.bytes += len(data) - self._entries.get(name, 0)
+        self._entries[name] = len(data)
+        self._entries.move_to_end(name)
+        await self._evict()
+
+    async def _evict(self) -> None:
+        victims = []
+        while self.bytes > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+            victims.append(self._path(name))
+        if victims:
+            await asyncio.to_thread(_unlink, victims)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+@dataclass(frozen=True)
+class ProxiedImage:
+    data: bytes
+    media_type: str
+    etag: str
+
+
+def _ref_name(url: str) -> str:
+    return "ref-" + hashlib.sha256(url.encode()).hexdigest()
+
+
+class ImageProxy:
+    def __init__(
+        self,
+        store: ImageStore,
+        *,
+        workers: int = 2,
+        quality: int = 80,
+        fetch_timeout: float = 10.0,
+        max_source_bytes: int = 10 * 1024 * 1024,
+        allowed_hosts: tuple[str, ...] = (),
+        cache_control: str = "public, max-age=86400",
+    ) -> None:
+        self.store = store
+        self.workers = workers
+        self.quality = quality
+        self.fetch_timeout = fetch_timeout
+        self.max_source_bytes = max_source_bytes
+        self.allowed_hosts = allowed_hosts
+        self.cache_control = cache_control
+        self.flights = SingleFlight()
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.resizes = 0
+        self._client: httpx.AsyncClient | None = None
+        self._pool: ProcessPoolExecutor | None = None
+
+    @classmethod
+    def from_env(cls) -> ImageProxy:
+        root = os.getenv("IMAGE_CACHE_DIR", "").strip() or os.path.join(tempfile.gettempdir(), "vehicle-images")
+        hosts = os.getenv("IMAGE_ALLOWED_HOSTS", "")
+        return cls(
+            ImageStore(Path(root), max_bytes=int(os.getenv("IMAGE_CACHE_MAX_MB", "512")) * 1024 * 1024),
+            workers=int(os.getenv("IMAGE_RESIZE_WORKERS", str(min(4, os.cpu_count() or 1)))),
+            quality=int(os.getenv("IMAGE_QUALITY", "80")),
+            fetch_timeout=float(os.getenv("IMAGE_FETCH_TIMEOUT", "10")),
+            allowed_hosts=tuple(host.strip().lower() for host in hosts.split(",") if host.strip()),
+            cache_control=os.getenv("IMAGE_CACHE_CONTROL", "public, max-age=86400").strip(),
+        )
+
+    async def start(self) -> None:
+        await self.store.load()
+        self._client = httpx.AsyncClient(timeout=self.fetch_timeout, follow_redirects=False)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def variant_width(self, requested: int | None) -> int | None:
+        """The stored width serving a request for ``requested`` pixels; None for the original."""
+        if requested is None:
+            return None
+        return next((width for width in VARIANT_WIDTHS if width >= requested), None)
+
+    async def render(self, url: str, width: int | None) -> ProxiedImage:
+        """The image at ``url``, scaled down to ``width`` unless it is already that narrow."""
+        digest = await self.store.get(_ref_name(url))
+        if digest is not None and width is not None:
+            # The common case: a thumbnail that is already on disk.
+            name = self._variant_name(digest.decode(), width)
+            data = await self.store.get(name)
+            if data:
+                return ProxiedImage(data, "image/jpeg", f'"{name}"')
+        return await self.flights.do(("image", url, width), lambda: self._render(url, width))
+
+    def _variant_name(self, digest: str, width: int) -> str:
+        return f"{digest}-w{width}-q{self.quality}"
+
+    async def _render(self, url: str, width: int | None) -> ProxiedImage:
+        digest, original = await self._original(url)
+        if width is not None:
+            name = self._variant_name(digest, width)
+            data = await self.store.get(name)
+            if data is None:
+                data = await self._resize(original, width)
+                # An empty variant records that the original is already narrow enough.
+                await self.store.put(name, data or b"")
+            if data:
+                return ProxiedImage(data, "image/jpeg", f'"{name}"')
+        media_type = sniff_media_type(original)
+        if media_type is None:
+            raise ImageFetchError("Source is not a supported image.")
+        return ProxiedImage(original, media_type, f'"{digest}"')
+
+    async def _original(self, url: str) -> tuple[str, bytes]:
+        ref = await self.store.get(_ref_name(url))
+        if ref is not None:
+            original = await self.store.get(ref.decode())
+            if original is not None:
+                return ref.decode(), original
+        original = await self._fetch(url)
+        digest = hashlib.sha256(original).hexdigest()
+        await self.store.put(digest, original)
+        await self.store.put(_ref_name(url), digest.encode())
+        return digest, original
+
+    async def _resize(self, original: bytes, width: int) -> bytes | None:
+        if self._pool is None:
+            # Spawned rather than forked: forking a process with a running event loop and threads is unsafe.
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self.resizes += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._pool, resize_to_jpeg, original, width, self.quality)
+        except BrokenProcessPool as exc:
+            # A worker died (for example, killed for memory); start a fresh pool next time.
+            self._pool = None
+            raise ImageFetchError("Image resizing failed.") from exc
+        except Exception as exc:  # noqa: BLE001
+            raise ImageFetchError(f"Could not decode image: {exc}") from exc
+
+    async def _check_url(self, url: str) -> str | None:
+        """Refuse URLs that would make the server fetch from somewhere it should not.
+
+        Image URLs come from clients, so without this the proxy could be aimed
+        at internal services. With ``allowed_hosts`` set, only those hosts (and
+        their subdomains) are fetched; otherwise any host whose addresses are
+        all public is, and the address vetted here is returned so the fetch
+        connects to it rather than resolving the name again (a second lookup
+        could be answered with an internal address).
+        """
+        parsed = urlparse(url)
+        host = (parsed.hostname or "").lower()
+        if parsed.scheme not in ("http", "https") or not host:
+            raise ImageFetchError("Image URL must be http or https.")
+        if self.allowed_hosts:
+            if not any(host == allowed or host.endswith("." + allowed) for allowed in self.allowed_hosts):
+                raise ImageFetchError(f"Image host {host} is not allowed.")
+            return None
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, parsed.port or 443, type=socket.SOCK_STREAM)
+        except OSError as exc:
+            raise ImageFetchError(f"Could not resolve {host}.") from exc
+        if not infos or not all(ipaddress.ip_address(info[4][0]).is_global for info in infos):
+            raise ImageFetchError(f"Image host {host} is not a public address.")
+        return infos[0][4][0]
+
+    async def _fetch(self, url: str) -> bytes:
+        assert self._client is not None, "ImageProxy.start() was not awaited"
+        self.fetches += 1
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                address = await self._check_url(url)
+                request = self._client.build_request("GET", url)
+                if address is not None:
+                    # The Host header is already set from the name; SNI and certificate checks use it too.
+                    request.extensions["sni_hostname"] = request.url.host
+                    request.url = request.url.copy_with(host=address)
+                response = await self._client.send(request, stream=True)
+                try:
+                    if response.is_redirect:
+                        url = urljoin(url, response.headers.get("location", ""))
+                        continue
+                    if response.status_code != 200:
+                        raise ImageFetchError(f"Image host returned {response.status_code}.")
+                    chunks = []
+                    size = 0
+                    async for chunk in response.aiter_bytes():
+                        size += len(chunk)
+                        if size > self.max_source_bytes:
+                            raise ImageFetchError("Source image is too large.")
+                        chunks.append(chunk)
+                finally:
+                    await response.aclose()
+                data = b"".join(chunks)
+                if sniff_media_type(data) is None:
+                    raise ImageFetchError("Source is not a supported image.")
+                return data
+            raise ImageFetchError("Too many redirects.")
+        except httpx.HTTPError as exc:
+            self.fetch_errors += 1
+            logger.warning("Fetching image %s failed: %s", url, exc)
+            raise ImageFetchError(f"Could not fetch image: {exc}") from exc
+        except ImageFetchError:
+            self.fetch_errors += 1
+            raise
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "store": self.store.stats(),
+            "fetches": self.fetches,
+            "fetch_errors": self.fetch_errors,
+            "resizes": self.resizes,
+            "single_flight": self.flights.stats(),
+        }
+
+
+def get_image_proxy(request: Request) -> ImageProxy:
+    proxy: ImageProxy | None = getattr(request.app.state, "image_proxy", None)
+    if proxy is None:
+        raise RuntimeError("Image proxy is not initialized.")
+    return proxy
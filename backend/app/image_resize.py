@@ -0,0 +1,27 @@
+"""Image resizing, run in worker processes by :mod:`app.image_proxy`.
+
+Kept apart from the web app so that spawned workers import only Pillow.
+"""
+
+from __future__ import annotations
+
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+
+def resize_to_jpeg(source: bytes, width: int, quality: int) -> bytes | None:
+    """``source`` scaled down to ``width`` pixels wide as a JPEG, or None if it is not wider than that."""
+    with Image.open(BytesIO(source)) as original:
+        if original.width <= width:
+            return None
+        # JPEG can decode at 1/2, 1/4 or 1/8 scale; skipping detail we would discard is much faster.
+        original.draft("RGB", (width, original.height * width // original.width))
+        image = ImageOps.exif_transpose(original)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+    out = BytesIO()
+    resized.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+    return out.getvalue()
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
-import json
-import subprocess
-import time
 import sys
+import time
 from collections.abc import AsyncIterator
 from pathlib import Path
 from typing import Any
@@ -13,53 +12,49 @@ from typing import Any
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
-from app.db import create_engine
+from app.change_feed import ChangeFeed, invalidate_local_state
+from app.compression import CompressionMiddleware, get_compressor
+from app.db import PoolSettings, create_engine, warm_pool
+from app.event_log import get_event_logger
+from app.image_proxy import ImageProxy
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from app.metrics import MetricsMiddleware, get_metrics
+from app.migrations import ensure_schema_current
+from app.replicas import PRIMARY_HEADER, ReplicaSet
+from app.request_timing import ServerTimingMiddleware, server_timing_enabled
+from app.request_timing import instrument_engine as instrument_request_timing
+from app.slow_queries import get_slow_query_log
+from app.suggest_index import SuggestIndex
+from app.response_cache import get_vehicle_cache
+from app.routers.image_routes import router as image_router
 from app.routers.vehicle_routes import router as vehicle_router
+from app.vehicle_count import get_vehicle_counter
+from app.write_batcher import CreateBatcher
 
 
 # Configure logger for the application
 logger = logging.getLogger(__name__)
 
-# Path to debug log for instrumentation
-LOG_PATH = Path(__file__).resolve().parents[2] / ".cursor" / "debug.log"
-
-
-def _debug_log(hypothesis_id: str, message: str, data: dict[str, Any]) -> None:
-    payload = {
-        "sessionId": "debug-session",
-        "runId": "run-pre-fix",
-        "hypothesisId": hypothesis_id,
-        "location": "app/main.py",
-        "message": message,
-        "data": data,
-        "timestamp": int(time.time() * 1000),
-    }
-    try:
-        with LOG_PATH.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(payload) + "\n")
-    except Exception:
-        # best-effort debug logging; never block startup
-        pass
+LOCATION = "app/main.py"
 
 
 # Load environment variables from .env file
 env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
-# region agent log
-_debug_log(
-    "H1",
+events = get_event_logger()
+events.emit(
     "env_loaded",
+    LOCATION,
     {
         "env_path_exists": env_path.exists(),
         "cwd": os.getcwd(),
     },
 )
-# region agent log
-_debug_log(
-    "H4",
+events.emit(
     "interpreter_info",
+    LOCATION,
     {
         "executable": sys.executable,
         "prefix": sys.prefix,
@@ -67,74 +62,106 @@ _debug_log(
         "venv": os.getenv("VIRTUAL_ENV"),
     },
 )
-# endregion
 
 
 def _load_cors_origins() -> list[str]:
     raw = os.getenv("CORS_ORIGINS", "")
     if not raw:
-        # region agent log
-        _debug_log("H2", "cors_origins_default", {})
-        # endregion
+        events.emit("cors_origins_default", LOCATION)
         return ["*"]
     origins = [item.strip() for item in raw.split(",") if item.strip()]
-    # region agent log
-    _debug_log("H2", "cors_origins_env", {"count": len(origins)})
-    # endregion
+    events.emit("cors_origins_env", LOCATION, {"count": len(origins)})
     return origins
 
 
-def _run_migrations() -> None:
-    """Run Alembic migrations at startup."""
-    alembic_dir = Path(__file__).parent.parent / "alembic"
-    if not alembic_dir.exists():
-        logger.warning("Alembic directory not found, skipping migrations")
-        return
-
-    try:
-        logger.info("Running database migrations...")
-        result = subprocess.run(
-            ["alembic", "upgrade", "head"],
-            cwd=Path(__file__).parent.parent,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        logger.info("Migrations completed successfully")
-        if result.stdout:
-            logger.info(f"Migration output: {result.stdout}")
-    except subprocess.CalledProcessError as exc:
-        logger.error(f"Migration failed: {exc.stderr}")
-        raise RuntimeError(f"Database migration failed: {exc.stderr}") from exc
-
-
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-    # region agent log
-    _debug_log("H3", "lifespan_start", {"database_url_set": bool(os.getenv("DATABASE_URL"))})
-    # endregion
+    events.emit("lifespan_start", LOCATION, {"database_url_set": bool(os.getenv("DATABASE_URL"))})
 
-    # Run migrations before creating the engine
-    _run_migrations()
+    try:
+        pool_settings = PoolSettings.from_env()
+        engine = create_engine(pool_settings)
+    except Exception as exc:  # noqa: BLE001
+        events.emit("engine_creation_failed", LOCATION, {"error": str(exc)})
+        raise
 
+    # Before the hooks below, so migration statements stay out of metrics and the slow-query log.
+    started = time.perf_counter()
     try:
-        engine = create_engine()
-        # region agent log
-        _debug_log("H5", "engine_created", {})
-        # endregion
+        outcome = await ensure_schema_current(engine)
     except Exception as exc:  # noqa: BLE001
-        # region agent log
-        _debug_log("H5", "engine_creation_failed", {"error": str(exc)})
-        # endregion
+        events.emit("migrations_failed", LOCATION, {"error": str(exc)})
+        await engine.dispose()
         raise
+    events.emit(
+        "migrations_checked",
+        LOCATION,
+        {"outcome": outcome.value, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)},
+    )
+
+    replicas = ReplicaSet.from_env(pool_settings)
+    engines = [engine, *(replicas.engines if replicas is not None else [])]
+    for position, each in enumerate(engines):
+        get_metrics().instrument_engine(each, pool_gauges=position == 0)
+        get_slow_query_log().instrument_engine(each)
+        if server_timing_enabled():
+            instrument_request_timing(each)
+    events.emit("engine_created", LOCATION, {"replicas": len(engines) - 1})
+
+    # Pay connection setup (TCP, TLS, auth) now rather than on the first requests.
+    started = time.perf_counter()
+    warmups = await asyncio.gather(
+        *(warm_pool(each, pool_settings.warmup) for each in engines),
+        return_exceptions=True,
+    )
+    failures = [item for item in warmups if isinstance(item, BaseException)]
+    for exc in failures:
+        logger.warning("Connection pool warmup failed: %s", exc)
+        events.emit("pool_warmup_failed", LOCATION, {"error": str(exc)})
+    events.emit(
+        "pool_warmed",
+        LOCATION,
+        {
+            "connections": sum(item for item in warmups if isinstance(item, int)),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    )
+
+    if replicas is not None:
+        await replicas.start()
+        events.emit(
+            "replicas_checked",
+            LOCATION,
+            {"healthy": sum(replica.healthy for replica in replicas.replicas), "total": len(replicas.replicas)},
+        )
+
+    # Fail fast on a bad VEHICLE_COUNT_STRATEGY rather than on the first request.
+    get_vehicle_counter()
 
     app.state.engine = engine
+    app.state.replicas = replicas
+    app.state.create_batcher = create_batcher = CreateBatcher.from_env(engine)
+    app.state.suggest_index = suggest_index = SuggestIndex.from_env(engine)
+    await suggest_index.start()
+    app.state.change_feed = change_feed = ChangeFeed.from_env(pool_settings)
+    if change_feed is not None:
+        change_feed.handlers.extend((invalidate_local_state, suggest_index.on_change))
+        change_feed.start()
+    app.state.image_proxy = image_proxy = ImageProxy.from_env()
+    await image_proxy.start()
     try:
         yield
     finally:
-        # region agent log
-        _debug_log("H3", "lifespan_cleanup", {})
-        # endregion
+        events.emit("lifespan_cleanup", LOCATION)
+        if change_feed is not None:
+            await change_feed.close()
+        await image_proxy.close()
+        await suggest_index.close()
+        if create_batcher is not None:
+            await create_batcher.close()
+        if replicas is not None:
+            await replicas.close()
         await engine.dispose()
+        await asyncio.to_thread(events.close)
 
 
 app = FastAPI(lifespan=lifespan, title="Tummala Motors API")
@@ -145,8 +172,14 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets cross-origin clients read their read-your-writes deadline without cookies.
+    expose_headers=[PRIMARY_HEADER],
 )
 
+# Inside error_boundary, which re-chunks every body it passes on; here a whole
+# body still arrives as one message and streams can be told apart.
+app.add_middleware(CompressionMiddleware, compressor=get_compressor())
+
 
 @app.middleware("http")
 async def error_boundary(request: Request, call_next: Any) -> JSONResponse:
@@ -160,7 +193,14 @@ async def error_boundary(request: Request, call_next: Any) -> JSONResponse:
         )
 
 
+if server_timing_enabled():
+    app.add_middleware(ServerTimingMiddleware)
+
+# Outermost, so it also times and counts the 500s produced by error_boundary.
+app.add_middleware(MetricsMiddleware, metrics=get_metrics())
+
 app.include_router(vehicle_router, prefix="/api")
+app.include_router(image_router, prefix="/api")
 
 
 @app.get("/health")
@@ -168,3 +208,59 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(content=get_metrics().render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/debug/cache")
+async def cache_stats() -> dict[str, Any]:
+    return get_vehicle_cache().stats()
+
+
+@app.get("/debug/replicas")
+async def replica_stats(request: Request) -> dict[str, Any]:
+    replicas = getattr(request.app.state, "replicas", None)
+    if replicas is None:
+        return {"replicas": []}
+    return replicas.stats()
+
+
+@app.get("/debug/write-batcher")
+async def write_batcher_stats(request: Request) -> dict[str, Any]:
+    batcher = getattr(request.app.state, "create_batcher", None)
+    return batcher.stats() if batcher is not None else {"enabled": False}
+
+
+@app.get("/debug/change-feed")
+async def change_feed_stats(request: Request) -> dict[str, Any]:
+    feed = getattr(request.app.state, "change_feed", None)
+    return feed.stats() if feed is not None else {"enabled": False}
+
+
+@app.get("/debug/images")
+async def image_stats(request: Request) -> dict[str, Any]:
+    return request.app.state.image_proxy.stats()
+
+
+@app.get("/debug/compression")
+async def compression_stats() -> dict[str, Any]:
+    return get_compressor().stats()
+
+
+@app.get("/debug/suggest")
+async def suggest_stats(request: Request) -> dict[str, Any]:
+    return request.app.state.suggest_index.stats()
+
+
+@app.get("/debug/slow-queries")
+async def slow_queries() -> dict[str, Any]:
+    return get_slow_query_log().snapshot()
+
+
+@app.delete("/debug/slow-queries", status_code=204, response_class=Response)
+async def clear_slow_queries() -> Response:
+    get_slow_query_log().clear()
+    return Response(status_code=204)
+
+
@@ -0,0 +1,250 @@
+"""Prometheus metrics: request latency, DB statement timing and pool usage.
+
+Everything is recorded on the event loop thread (SQLAlchemy's cursor and
+pool hooks run there too under asyncio), so observations are plain list
+increments with no locking. Samples are only formatted when ``/metrics`` is
+scraped.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Statement label values; anything else is reported as OTHER to bound cardinality.
+_DB_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "CREATE", "DROP", "ANALYZE", "EXPLAIN"})
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        for values, total in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labels, values)} {_format_value(total)}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = REQUEST_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        # Per label set: one count per bucket plus +Inf, then the sum.
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, seconds: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0.0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, seconds)] += 1
+        series[-1] += seconds
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for values, series in sorted(self._series.items()):
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, float("inf")), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, values, le)} {_format_value(cumulative)}"
+            yield f"{self.name}_sum{_format_labels(self.labels, values)} {repr(series[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labels, values)} {_format_value(cumulative)}"
+
+
+class Gauge:
+    """Gauge whose value is read from ``read`` at scrape time."""
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {_format_value(self.read())}"
+
+
+class AppMetrics:
+    def __init__(self, *, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.request_duration = Histogram(
+            "http_request_duration_seconds",
+            "Time from request start until response headers are sent.",
+            ("method", "route"),
+        )
+        self.requests = Counter(
+            "http_requests_total",
+            "Requests handled, by route and status code.",
+            ("method", "route", "status"),
+        )
+        self.db_statement_duration = Histogram(
+            "db_statement_duration_seconds",
+            "Statement execution time as seen by the driver.",
+            ("operation",),
+            DB_BUCKETS,
+        )
+        self.pool_checkout_wait = Histogram(
+            "db_pool_checkout_wait_seconds",
+            "Time spent obtaining a pooled connection, including opening a new one.",
+            buckets=DB_BUCKETS,
+        )
+        self._gauges: list[Gauge] = []
+
+    @classmethod
+    def from_env(cls) -> AppMetrics:
+        return cls(enabled=os.getenv("METRICS_ENABLED", "true").strip().lower() not in {"0", "false", "no", "off"})
+
+    def instrument_engine(self, engine: AsyncEngine, *, pool_gauges: bool = True) -> None:
+        """Time every statement and pool checkout on ``engine``, and expose its pool gauges.
+
+        Timings from several engines (primary and replicas) share one series;
+        pass ``pool_gauges=False`` for all but one, since gauge names are unlabelled.
+        """
+        if not self.enabled:
+            return
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _before(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+            conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _after(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+            started = conn.info["metrics_started"].pop()
+            keyword = statement.lstrip()[:8].split(None, 1)[0].upper() if statement.strip() else ""
+            operation = keyword if keyword in _DB_OPERATIONS else "OTHER"
+            self.db_statement_duration.observe(time.perf_counter() - started, operation)
+
+        @event.listens_for(sync_engine, "handle_error")
+        def _failed(context: Any) -> None:
+            stack = context.connection.info.get("metrics_started") if context.connection is not None else None
+            if stack:
+                stack.pop()
+
+        pool = sync_engine.pool
+        if hasattr(pool, "checkout_observers"):
+            pool.checkout_observers.append(self.pool_checkout_wait.observe)
+        if not pool_gauges:
+            return
+        for name, help_text, attribute in (
+            ("db_pool_size", "Connections the pool keeps open.", "size"),
+            ("db_pool_checked_out", "Connections currently in use.", "checkedout"),
+            ("db_pool_checked_in", "Idle connections available in the pool.", "checkedin"),
+            ("db_pool_overflow", "Connections open beyond the pool size.", "overflow"),
+        ):
+            if hasattr(pool, attribute):
+                # QueuePool.overflow() counts up from -pool_size; report only real overflow.
+                read = getattr(pool, attribute)
+                self._gauges.append(Gauge(name, help_text, lambda read=read: max(read(), 0)))
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        self.request_duration.observe(seconds, method, route)
+        self.requests.inc(method, route, str(status))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in (
+            self.request_duration,
+            self.requests,
+            self.db_statement_duration,
+            self.pool_checkout_wait,
+            *self._gauges,
+        ):
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and status per route template.
+
+    Routes are labelled by their path template (``/api/vehicles/{vin}``), so
+    label cardinality stays bounded; requests that match no route share the
+    ``unmatched`` label.
+    """
+
+    def __init__(self, app: Any, metrics: AppMetrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        recorded = False
+
+        def record() -> None:
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            self.metrics.observe_request(scope["method"], template, status_code, time.perf_counter() - started)
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                record()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            record()
+
+
+_metrics: AppMetrics | None = None
+
+
+def get_metrics() -> AppMetrics:
+    global _metrics
+    if _metrics is None:
+        _metrics = AppMetrics.from_env()
+    return _metrics
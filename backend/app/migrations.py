@@ -0,0 +1,89 @@
+"""Bring the schema to the Alembic head at startup without a subprocess.
+
+The common case, a schema already at head, costs one ``alembic_version``
+read on a pooled connection. Otherwise the upgrade runs in-process inside a
+single transaction that first takes a transaction-scoped advisory lock, so
+when several workers boot at once only one migrates; the rest wait, see the
+new version and return. The lock is released at commit, which also makes it
+safe behind PgBouncer in transaction pooling mode.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from enum import Enum
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Arbitrary constant shared by every process that migrates this database.
+MIGRATION_LOCK_KEY = 0x7461_6D6D_6967
+
+
+class MigrationOutcome(str, Enum):
+    SKIPPED = "skipped"
+    CURRENT = "current"
+    UPGRADED = "upgraded"
+
+
+def startup_migrations_enabled() -> bool:
+    return os.getenv("SKIP_STARTUP_MIGRATIONS", "false").strip().lower() not in {"1", "true", "yes", "on"}
+
+
+def _alembic_config() -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+def _current_heads(connection: Connection) -> set[str]:
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def _upgrade_locked(connection: Connection, config: Config, heads: set[str]) -> bool:
+    """Upgrade to head under the advisory lock; False if another process already did."""
+    with connection.begin():
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        if _current_heads(connection) == heads:
+            return False
+        # env.py migrates this connection, inside this transaction, instead of opening its own.
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+    return True
+
+
+async def ensure_schema_current(engine: AsyncEngine) -> MigrationOutcome:
+    """Upgrade the database behind ``engine`` to the Alembic head if it is behind."""
+    if not startup_migrations_enabled():
+        return MigrationOutcome.SKIPPED
+    config = _alembic_config()
+    if not (BACKEND_DIR / "alembic").exists():
+        logger.warning("Alembic directory not found, skipping migrations")
+        return MigrationOutcome.SKIPPED
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+
+    async with engine.connect() as conn:
+        current = await conn.run_sync(_current_heads)
+        await conn.rollback()
+        if current == heads:
+            return MigrationOutcome.CURRENT
+        logger.info("Database at %s, upgrading to %s", sorted(current) or "base", sorted(heads))
+        try:
+            upgraded = await conn.run_sync(_upgrade_locked, config, heads)
+        except Exception as exc:
+            raise RuntimeError(f"Database migration failed: {exc}") from exc
+    if upgraded:
+        logger.info("Migrations completed successfully")
+        return MigrationOutcome.UPGRADED
+    return MigrationOutcome.CURRENT
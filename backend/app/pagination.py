@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position in the ``(created_at DESC, vin DESC)`` ordering of vehicles.
+
+    ``backward`` marks a cursor that pages towards newer vehicles (the
+    "previous" page) instead of older ones.
+    """
+
+    created_at: datetime
+    vin: str
+    backward: bool = False
+
+
+def encode_cursor(created_at: datetime, vin: str, *, backward: bool = False) -> str:
+    payload = {"c": created_at.isoformat(), "v": vin}
+    if backward:
+        payload["b"] = 1
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str) -> Cursor:
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode("ascii"))
+        payload = json.loads(raw)
+        created_at = datetime.fromisoformat(payload["c"])
+        vin = payload["v"]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursorError("Invalid cursor.") from exc
+
+    if not isinstance(vin, str) or not vin or created_at.tzinfo is None:
+        raise InvalidCursorError("Invalid cursor.")
+
+    return Cursor(created_at=created_at, vin=vin, backward=bool(payload.get("b")))
@@ -1,51 +1,414 @@
 from __future__ import annotations
 
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass, fields
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import ARRAY, TIMESTAMP, Column, MetaData, Table, Text, func, insert, select
+from sqlalchemy import (
+    ARRAY,
+    TIMESTAMP,
+    BigInteger,
+    Column,
+    Computed,
+    Index,
+    Integer,
+    MetaData,
+    Table,
+    Text,
+    any_,
+    bindparam,
+    case,
+    cast,
+    column,
+    func,
+    select,
+    table,
+    text,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.schema import CreateTable
 
 metadata = MetaData()
 
+
+def _payload_columns() -> list[Column]:
+    """Columns a client or feed supplies for a vehicle, besides ``vin``."""
+    return [
+        Column("make", Text, nullable=False),
+        Column("model", Text, nullable=False),
+        Column("description", Text, nullable=False),
+        Column("image_urls", ARRAY(Text), nullable=False, server_default="{}"),
+        Column("year", Integer),
+        Column("price", Integer),
+        Column("mileage", Integer),
+        Column("trim", Text),
+        Column("exterior_color", Text),
+        Column("interior_color", Text),
+        Column("fuel_type", Text),
+        Column("transmission", Text),
+    ]
+
+
 vehicles_table = Table(
     "vehicles",
     metadata,
     Column("vin", Text, primary_key=True),
-    Column("make", Text, nullable=False),
-    Column("model", Text, nullable=False),
-    Column("description", Text, nullable=False),
-    Column("image_urls", ARRAY(Text), nullable=False, server_default="{}"),
+    *_payload_columns(),
     Column("created_at", TIMESTAMP(timezone=True), nullable=False, server_default=func.now()),
+    # Maintained by the vehicles_set_content_hash trigger on every insert/update.
+    Column("content_hash", Text),
+    Column("updated_at", TIMESTAMP(timezone=True), nullable=False, server_default=func.now()),
+    Column("deleted_at", TIMESTAMP(timezone=True)),
+    Column(
+        "search_vector",
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', make), 'A') || "
+            "setweight(to_tsvector('english', model), 'A') || "
+            "setweight(to_tsvector('english', description), 'B')",
+            persisted=True,
+        ),
+        nullable=False,
+    ),
 )
 
+# Hashed by the vehicles_set_content_hash trigger, in this order.
+CONTENT_COLUMNS = tuple(col.name for col in _payload_columns())
+
+SEARCH_CONFIG = "english"
+# Search ranks at most this many matches (the newest); see build_search_vehicles_stmt.
+SEARCH_MAX_RESULTS = 1000
+
+# Soft-deleted vehicles (sold cars dropped from the feed) are hidden from readers.
+is_active = vehicles_table.c.deleted_at.is_(None)
+
+# Backs both OFFSET and keyset pagination; vin breaks ties between rows
+# inserted in the same transaction (e.g. by the seeder).
+Index(
+    "ix_vehicles_created_at_vin",
+    vehicles_table.c.created_at.desc(),
+    vehicles_table.c.vin.desc(),
+    postgresql_where=is_active,
+)
+Index("ix_vehicles_search_vector", vehicles_table.c.search_vector, postgresql_using="gin")
+# Range filters; Postgres combines these with bitmap AND when several are used.
+Index("ix_vehicles_price", vehicles_table.c.price, postgresql_where=is_active)
+Index("ix_vehicles_mileage", vehicles_table.c.mileage, postgresql_where=is_active)
+Index("ix_vehicles_year", vehicles_table.c.year, postgresql_where=is_active)
+# Equality on make/model (optionally with a year range) and on fuel type with a price range.
+Index(
+    "ix_vehicles_make_model_year",
+    vehicles_table.c.make,
+    vehicles_table.c.model,
+    vehicles_table.c.year,
+    postgresql_where=is_active,
+)
+Index(
+    "ix_vehicles_fuel_type_price",
+    vehicles_table.c.fuel_type,
+    vehicles_table.c.price,
+    postgresql_where=is_active,
+)
+
+# Session-local landing table for COPY-based bulk loads. It lives in its own
+# MetaData so migrations never try to manage it, and it empties on commit.
+vehicle_staging_table = Table(
+    "vehicle_bulk_staging",
+    MetaData(),
+    Column("vin", Text),
+    *(Column(col.name, col.type) for col in _payload_columns()),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DELETE ROWS",
+)
+
+
+@dataclass(frozen=True)
+class VehicleFilters:
+    """Server-side filters for vehicle listings; ``None`` means unfiltered."""
+
+    make: str | None = None
+    model: str | None = None
+    trim: str | None = None
+    exterior_color: str | None = None
+    interior_color: str | None = None
+    fuel_type: str | None = None
+    transmission: str | None = None
+    min_year: int | None = None
+    max_year: int | None = None
+    min_price: int | None = None
+    max_price: int | None = None
+    min_mileage: int | None = None
+    max_mileage: int | None = None
+
+    @property
+    def is_empty(self) -> bool:
+        return all(getattr(self, item.name) is None for item in fields(self))
+
+    def cache_key(self) -> tuple[Any, ...]:
+        return tuple(getattr(self, item.name) for item in fields(self))
+
+    def clauses(self) -> list[Any]:
+        c = vehicles_table.c
+        clauses: list[Any] = [is_active]
+        for name in ("make", "model", "trim", "exterior_color", "interior_color", "fuel_type", "transmission"):
+            value = getattr(self, name)
+            if value is not None:
+                clauses.append(c[name] == value)
+        for name in ("year", "price", "mileage"):
+            low = getattr(self, f"min_{name}")
+            high = getattr(self, f"max_{name}")
+            if low is not None:
+                clauses.append(c[name] >= low)
+            if high is not None:
+                clauses.append(c[name] <= high)
+        return clauses
+
+
+NO_FILTERS = VehicleFilters()
+
+
+def _project(columns: list[Any], fields: Sequence[str] | None, always: tuple[str, ...]) -> list[Any]:
+    """``columns`` narrowed to ``fields`` plus ``always``, in their original order."""
+    if fields is None:
+        return columns
+    keep = {*fields, *always}
+    return [col for col in columns if col.key in keep]
+
+
+def _list_columns(fields: Sequence[str] | None = None) -> list[Any]:
+    """List item columns in model order; a projection keeps vin and created_at for cursors."""
+    columns = [
+        vehicles_table.c.vin,
+        vehicles_table.c.make,
+        vehicles_table.c.model,
+        vehicles_table.c.year,
+        vehicles_table.c.price,
+        vehicles_table.c.mileage,
+        vehicles_table.c.created_at,
+        # Arrays are 1-based; NULL when the vehicle has no images.
+        vehicles_table.c.image_urls[1].label("cover_image"),
+    ]
+    return _project(columns, fields, ("vin", "created_at"))
+
 
-def build_list_vehicles_stmt(*, limit: int, offset: int) -> Any:
+def _detail_columns(fields: Sequence[str] | None = None) -> list[Any]:
+    columns = [
+        vehicles_table.c.vin,
+        *(vehicles_table.c[name] for name in CONTENT_COLUMNS),
+        vehicles_table.c.created_at,
+    ]
+    return _project(columns, fields, ("vin",))
+
+
+def build_list_vehicles_stmt(
+    *,
+    limit: int,
+    offset: int,
+    filters: VehicleFilters = NO_FILTERS,
+    fields: Sequence[str] | None = None,
+) -> Any:
     return (
+        select(*_list_columns(fields))
+        .where(*filters.clauses())
+        .order_by(vehicles_table.c.created_at.desc(), vehicles_table.c.vin.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+
+
+def build_list_vehicles_keyset_stmt(
+    *,
+    limit: int,
+    created_at: datetime,
+    vin: str,
+    backward: bool = False,
+    filters: VehicleFilters = NO_FILTERS,
+    fields: Sequence[str] | None = None,
+) -> Any:
+    """Select the page strictly after (or, if ``backward``, before) a cursor row.
+
+    Backward pages come back in ascending order; callers reverse them.
+    """
+    position = tuple_(vehicles_table.c.created_at, vehicles_table.c.vin)
+    stmt = select(*_list_columns(fields)).where(*filters.clauses())
+    if backward:
+        stmt = stmt.where(position > tuple_(created_at, vin)).order_by(
+            vehicles_table.c.created_at.asc(), vehicles_table.c.vin.asc()
+        )
+    else:
+        stmt = stmt.where(position < tuple_(created_at, vin)).order_by(
+            vehicles_table.c.created_at.desc(), vehicles_table.c.vin.desc()
+        )
+    return stmt.limit(limit)
+
+
+def build_export_vehicles_stmt(filters: VehicleFilters = NO_FILTERS) -> Any:
+    """Every live vehicle (matching ``filters``) in VIN order, for streaming exports."""
+    return select(*_detail_columns()).where(*filters.clauses()).order_by(vehicles_table.c.vin)
+
+
+def build_count_vehicles_stmt(filters: VehicleFilters = NO_FILTERS) -> Any:
+    return select(func.count()).select_from(vehicles_table).where(*filters.clauses())
+
+
+def build_exact_count_vehicles_expr(filters: VehicleFilters = NO_FILTERS) -> Any:
+    """Scalar subquery with the exact row count, for folding into another SELECT."""
+    return build_count_vehicles_stmt(filters).scalar_subquery()
+
+
+def build_capped_count_vehicles_expr(filters: VehicleFilters, *, cap: int) -> Any:
+    """Scalar subquery counting rows matching ``filters``, but stopping at ``cap``."""
+    matches = select(vehicles_table.c.vin).where(*filters.clauses()).limit(cap).subquery()
+    return select(func.count()).select_from(matches).scalar_subquery()
+
+
+def build_estimated_count_vehicles_expr(*, min_rows: int) -> Any:
+    """Planner row estimate from ``pg_class.reltuples``, or the exact count below ``min_rows``.
+
+    Postgres evaluates uncorrelated subqueries lazily, so the ``count(*)``
+    branch only runs when the estimate is too small (or the table has never
+    been analyzed and reports -1).
+    """
+    pg_class = table("pg_class", column("oid"), column("reltuples"))
+    reltuples = (
+        select(cast(pg_class.c.reltuples, BigInteger))
+        .where(pg_class.c.oid == func.to_regclass(vehicles_table.name))
+        .scalar_subquery()
+    )
+    return case((reltuples >= min_rows, reltuples), else_=build_exact_count_vehicles_expr())
+
+
+def _search_matches(query: str) -> Any:
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    return vehicles_table.c.search_vector.bool_op("@@")(ts_query)
+
+
+def search_max_results() -> int:
+    return int(os.getenv("SEARCH_MAX_RESULTS", str(SEARCH_MAX_RESULTS)))
+
+
+def build_search_vehicles_stmt(*, query: str, limit: int, offset: int, max_results: int) -> Any:
+    """Rank the ``max_results`` newest matches of a web-style search ``query``.
+
+    Matches over make, model and description are taken newest first, and
+    only those candidates are ranked, so a broad query ("leather") costs the
+    same as a narrow one instead of scoring every match. An older match that
+    would rank higher is not returned when more than ``max_results`` match.
+    Ranking reads the stored ``search_vector`` rather than re-parsing the
+    description.
+
+    One candidate past the cap is read so that ``total`` (the candidate
+    count) exceeds ``max_results`` exactly when the cap was hit; that extra
+    row is never ranked or returned.
+    """
+    recency = (vehicles_table.c.created_at.desc(), vehicles_table.c.vin.desc())
+    candidates = (
         select(
-            vehicles_table.c.vin,
-            vehicles_table.c.make,
-            vehicles_table.c.model,
-            vehicles_table.c.created_at,
+            *_list_columns(),
+            vehicles_table.c.search_vector,
+            func.row_number().over(order_by=recency).label("recency"),
         )
-        .order_by(vehicles_table.c.created_at.desc())
+        .where(_search_matches(query), is_active)
+        .order_by(*recency)
+        .limit(max_results + 1)
+        .cte("candidates")
+    )
+    rank = func.ts_rank(candidates.c.search_vector, func.websearch_to_tsquery(SEARCH_CONFIG, query))
+    return (
+        select(
+            *(candidates.c[col.key] for col in _list_columns()),
+            rank.label("rank"),
+            select(func.count()).select_from(candidates).scalar_subquery().label("total"),
+        )
+        .where(candidates.c.recency <= max_results)
+        .order_by(rank.desc(), candidates.c.created_at.desc(), candidates.c.vin.desc())
         .limit(limit)
         .offset(offset)
     )
 
 
-def build_count_vehicles_stmt() -> Any:
-    return select(func.count()).select_from(vehicles_table)
+def build_count_search_vehicles_stmt(*, query: str, max_results: int) -> Any:
+    """The ``total`` of :func:`build_search_vehicles_stmt`, for pages past the last match."""
+    matches = select(vehicles_table.c.vin).where(_search_matches(query), is_active).limit(max_results + 1).subquery()
+    return select(func.count()).select_from(matches)
 
 
-def build_get_vehicle_by_vin_stmt(*, vin: str) -> Any:
-    return select(
-        vehicles_table.c.vin,
-        vehicles_table.c.make,
-        vehicles_table.c.model,
-        vehicles_table.c.description,
-        vehicles_table.c.image_urls,
-        vehicles_table.c.created_at,
-    ).where(vehicles_table.c.vin == vin)
+def build_custom_plans_stmt() -> Any:
+    """Plan the rest of this transaction's statements for their actual parameters.
+
+    After a few executions Postgres may reuse a generic plan for a prepared
+    statement. For search that plan guesses a few hundred matches whatever
+    the query, and bitmap-scans every match of a broad term (~0.6 s on 300k
+    rows) where a custom plan walks the newest rows and stops at the cap.
+    """
+    return text("SET LOCAL plan_cache_mode = force_custom_plan")
+
+
+def build_count_makes_models_stmt() -> Any:
+    """Live vehicles per distinct (make, model), for the typeahead index."""
+    c = vehicles_table.c
+    return select(c.make, c.model, func.count().label("count")).where(is_active).group_by(c.make, c.model)
+
+
+def _version_columns() -> list[Any]:
+    """Columns that change whenever a vehicle row does; the basis of its ETag."""
+    return [vehicles_table.c.updated_at, vehicles_table.c.content_hash]
+
+
+def build_get_vehicle_by_vin_stmt(*, vin: str, fields: Sequence[str] | None = None) -> Any:
+    """A live vehicle with its version columns; ``fields`` selects only those detail columns (and vin)."""
+    return select(*_detail_columns(fields), *_version_columns()).where(vehicles_table.c.vin == vin, is_active)
+
+
+def build_get_vehicle_version_stmt(*, vin: str) -> Any:
+    """Just the version of a live vehicle, to answer conditional requests without the body."""
+    return select(*_version_columns()).where(vehicles_table.c.vin == vin, is_active)
+
+
+def build_get_vehicles_by_vins_stmt(*, vins: list[str]) -> Any:
+    """Fetch many vehicles in one query; VINs that are missing or deleted are simply absent."""
+    return select(*_detail_columns(), *_version_columns()).where(
+        vehicles_table.c.vin == any_(bindparam("vins", vins, type_=ARRAY(Text))),
+        is_active,
+    )
+
+
+def build_get_vehicle_image_url_stmt(*, vin: str, index: int) -> Any:
+    """Entry ``index`` (0-based) of a live vehicle's ``image_urls``; NULL when out of range."""
+    return select(vehicles_table.c.image_urls[index + 1]).where(vehicles_table.c.vin == vin, is_active)
+
+
+def build_snapshot_stmt() -> Any:
+    """The statement's MVCC snapshot as text; equal snapshots see equal data."""
+    return select(cast(func.pg_current_snapshot(), Text))
+
+
+VEHICLE_CHANGES_CHANNEL = "vehicle_changes"
+
+
+def build_notify_vehicle_changes_stmt(payload: str) -> Any:
+    """Queue ``payload`` for listeners; Postgres delivers it only if the transaction commits."""
+    return select(func.pg_notify(VEHICLE_CHANGES_CHANNEL, payload))
+
+
+def _revive_soft_deleted(stmt: Any) -> Any:
+    """Let an insert take over the VIN of a soft-deleted vehicle, but never a live one.
+
+    A re-listed vehicle counts as new inventory, so ``created_at`` restarts.
+    """
+    return stmt.on_conflict_do_update(
+        index_elements=[vehicles_table.c.vin],
+        set_={
+            **{name: stmt.excluded[name] for name in CONTENT_COLUMNS},
+            "created_at": func.now(),
+            "deleted_at": None,
+        },
+        where=vehicles_table.c.deleted_at.is_not(None),
+    )
 
 
 def build_create_vehicle_stmt(
@@ -55,25 +418,63 @@ def build_create_vehicle_stmt(
     model: str,
     description: str,
     image_urls: list[str],
+    year: int | None = None,
+    price: int | None = None,
+    mileage: int | None = None,
+    trim: str | None = None,
+    exterior_color: str | None = None,
+    interior_color: str | None = None,
+    fuel_type: str | None = None,
+    transmission: str | None = None,
 ) -> Any:
-    return (
-        insert(vehicles_table)
-        .values(
-            vin=vin,
-            make=make,
-            model=model,
-            description=description,
-            image_urls=image_urls,
-        )
-        .returning(
-            vehicles_table.c.vin,
-            vehicles_table.c.make,
-            vehicles_table.c.model,
-            vehicles_table.c.description,
-            vehicles_table.c.image_urls,
-            vehicles_table.c.created_at,
-        )
+    """Insert a vehicle; returns no row if a live vehicle already has this VIN."""
+    stmt = pg_insert(vehicles_table).values(
+        vin=vin,
+        make=make,
+        model=model,
+        description=description,
+        image_urls=image_urls,
+        year=year,
+        price=price,
+        mileage=mileage,
+        trim=trim,
+        exterior_color=exterior_color,
+        interior_color=interior_color,
+        fuel_type=fuel_type,
+        transmission=transmission,
+    )
+    return _revive_soft_deleted(stmt).returning(*_detail_columns())
+
+
+def build_create_vehicles_stmt(vehicles: Sequence[dict[str, Any]]) -> Any:
+    """Insert several vehicles in one statement; live VINs return no row.
+
+    VINs must be distinct: ``ON CONFLICT DO UPDATE`` cannot touch a row twice.
+    """
+    stmt = pg_insert(vehicles_table).values(
+        [{name: vehicle.get(name) for name in ("vin", *CONTENT_COLUMNS)} for vehicle in vehicles]
+    )
+    return _revive_soft_deleted(stmt).returning(*_detail_columns())
+
+
+def build_create_vehicle_staging_stmt() -> Any:
+    return CreateTable(vehicle_staging_table, if_not_exists=True)
+
+
+def build_merge_staged_vehicles_stmt() -> Any:
+    """Move staged rows into ``vehicles``, keeping live VINs and one row per duplicate VIN.
+
+    Returns one ``(make, model, count)`` row per distinct pair actually inserted.
+    """
+    names = ["vin", *CONTENT_COLUMNS]
+    staged = (
+        select(*(vehicle_staging_table.c[name] for name in names))
+        .distinct(vehicle_staging_table.c.vin)
+        .order_by(vehicle_staging_table.c.vin)
     )
+    stmt = pg_insert(vehicles_table).from_select(names, staged)
+    merged = _revive_soft_deleted(stmt).returning(vehicles_table.c.make, vehicles_table.c.model).cte("merged")
+    return select(merged.c.make, merged.c.model, func.count().label("count")).group_by(merged.c.make, merged.c.model)
 
 
 def vehicle_row_to_dict(row: Any) -> dict[str, Any]:
@@ -88,7 +489,13 @@ def vehicle_row_to_dict(row: Any) -> dict[str, Any]:
         "model": row.model,
         "description": getattr(row, "description", None),
         "image_urls": image_urls,
+        "year": getattr(row, "year", None),
+        "price": getattr(row, "price", None),
+        "mileage": getattr(row, "mileage", None),
+        "trim": getattr(row, "trim", None),
+        "exterior_color": getattr(row, "exterior_color", None),
+        "interior_color": getattr(row, "interior_color", None),
+        "fuel_type": getattr(row, "fuel_type", None),
+        "transmission": getattr(row, "transmission", None),
         "created_at": created_at,
     }
-
-
@@ -0,0 +1,235 @@
+"""Route read-only handlers to read replicas.
+
+``DATABASE_REPLICA_URLS`` lists replicas; each gets its own engine built with
+the same pool settings as the primary. Reads are spread round-robin over the
+replicas that passed their last health check, which also measures replication
+lag; a replica that is down or too far behind is skipped until it recovers,
+and with none left reads go to the primary.
+
+Read-your-writes: a write sets a short-lived cookie and the same deadline in
+an ``X-Read-Primary-Until`` header (for cross-origin clients, which do not
+send cookies). Requests carrying either read from the primary, bypassing the
+response cache, until it expires, so a client sees its own changes even
+while the replicas are still catching up. For everyone else, replica reads
+are not cached until the replicas have had time to replay the write (see
+:func:`may_fill_cache`), so the cache never serves a write's pre-image.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import parse_qsl, urlparse
+
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db import PoolSettings, create_engine, get_db_engine
+from app.response_cache import VehicleResponseCache, get_vehicle_cache
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_COOKIE = "read_primary_until"
+PRIMARY_HEADER = "X-Read-Primary-Until"
+
+# Zero lag while the replica has replayed everything it received; otherwise
+# the age of the last replayed transaction. NULL when not a standby.
+_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: AsyncEngine
+    healthy: bool = True
+    lag: float | None = None
+    last_error: str | None = None
+    checked_at: float | None = None
+    reads: int = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "last_error": self.last_error,
+            "reads": self.reads,
+        }
+
+
+@dataclass
+class ReplicaSet:
+    replicas: list[Replica]
+    check_interval: float = 5.0
+    check_timeout: float = 2.0
+    max_lag: float = 10.0
+    sticky_seconds: float = 5.0
+    fallback_reads: int = 0
+    pinned_reads: int = 0
+    _next: int = 0
+    _checker: asyncio.Task[None] | None = field(default=None, repr=False)
+
+    @classmethod
+    def from_env(cls, settings: PoolSettings) -> ReplicaSet | None:
+        urls = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+        if not urls:
+            return None
+        return cls(
+            replicas=[Replica(_display_name(url), create_engine(settings, database_url=url)) for url in urls],
+            check_interval=float(os.getenv("DATABASE_REPLICA_CHECK_INTERVAL", "5")),
+            max_lag=float(os.getenv("DATABASE_REPLICA_MAX_LAG", "10")),
+            sticky_seconds=float(os.getenv("DATABASE_REPLICA_STICKY_SECONDS", "5")),
+        )
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return [replica.engine for replica in self.replicas]
+
+    def choose(self) -> Replica | None:
+        """Next healthy replica in round-robin order, or None to use the primary."""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if replica.healthy:
+                replica.reads += 1
+                return replica
+        self.fallback_reads += 1
+        return None
+
+    @staticmethod
+    async def _read_lag(replica: Replica) -> Any:
+        async with replica.engine.connect() as conn:
+            return (await conn.execute(_LAG_QUERY)).scalar_one()
+
+    async def check(self, replica: Replica) -> None:
+        try:
+            lag = await asyncio.wait_for(self._read_lag(replica), self.check_timeout)
+        except Exception as exc:  # noqa: BLE001
+            if replica.healthy:
+                logger.warning("Replica %s failed its health check: %s", replica.name, exc)
+            replica.healthy = False
+            replica.last_error = str(exc) or type(exc).__name__
+        else:
+            replica.lag = float(lag or 0)
+            replica.healthy = replica.lag <= self.max_lag
+            replica.last_error = None if replica.healthy else f"lag {replica.lag:.1f}s exceeds {self.max_lag:g}s"
+        replica.checked_at = time.time()
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+
+    async def _run_checks(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check_all()
+
+    async def start(self) -> None:
+        await self.check_all()
+        self._checker = asyncio.create_task(self._run_checks())
+
+    async def close(self) -> None:
+        if self._checker is not None:
+            self._checker.cancel()
+        await asyncio.gather(*(engine.dispose() for engine in self.engines))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "replicas": [replica.stats() for replica in self.replicas],
+            # Reads sent to the primary: no replica was healthy / the client had just written.
+            "fallback_reads": self.fallback_reads,
+            "pinned_reads": self.pinned_reads,
+            "max_lag_seconds": self.max_lag,
+            "sticky_seconds": self.sticky_seconds,
+        }
+
+
+def _display_name(url: str) -> str:
+    """Host, port and database of ``url`` without credentials."""
+    parsed = urlparse(url)
+    # Unix-socket URLs carry the host as ?host=/path.
+    host = parsed.hostname or dict(parse_qsl(parsed.query)).get("host", "localhost")
+    port = f":{parsed.port}" if parsed.port else ""
+    return f"{host}{port}{parsed.path}"
+
+
+def pinned_to_primary(request: Request) -> bool:
+    """Whether this client wrote within the stickiness window, so must read from the primary."""
+    replicas: ReplicaSet | None = getattr(request.app.state, "replicas", None)
+    if replicas is None:
+        return False
+    now = time.time()
+    for raw in (request.headers.get(PRIMARY_HEADER), request.cookies.get(PRIMARY_COOKIE)):
+        try:
+            until = float(raw) if raw is not None else 0.0
+        except ValueError:
+            continue
+        # Clients choose the value, so one further out than a write could set is ignored.
+        if now < until <= now + replicas.sticky_seconds + 1:
+            return True
+    return False
+
+
+def get_read_engine(request: Request) -> AsyncEngine:
+    """Engine for a read-only handler: a healthy replica, or the primary.
+
+    The primary is used when no replicas are configured or healthy, and for
+    clients that wrote within the stickiness window.
+    """
+    replicas: ReplicaSet | None = getattr(request.app.state, "replicas", None)
+    if replicas is not None:
+        if pinned_to_primary(request):
+            replicas.pinned_reads += 1
+        elif (replica := replicas.choose()) is not None:
+            return replica.engine
+    return get_db_engine(request)
+
+
+def get_read_cache(request: Request) -> VehicleResponseCache:
+    """The shared response cache, or a pass-through one for clients pinned to the primary.
+
+    Pages cached after a write may still have been read from a lagging
+    replica, so a pinned client neither reads them nor fills the cache.
+    """
+    if pinned_to_primary(request):
+        return VehicleResponseCache.passthrough()
+    return get_vehicle_cache()
+
+
+def may_fill_cache(request: Request, engine: AsyncEngine, cache: VehicleResponseCache) -> bool:
+    """Whether a read from ``engine`` starting now may be stored in ``cache``.
+
+    A replica can trail a write by up to ``max_lag``, and the writer reads
+    from the primary for ``sticky_seconds``. Until both have passed since
+    the cache was last invalidated, a replica read could store the pre-write
+    state under the new generation, and every reader on this worker
+    (the writer too, once its pin expires) would be served it for the TTL.
+    """
+    replicas: ReplicaSet | None = getattr(request.app.state, "replicas", None)
+    if replicas is None or engine is get_db_engine(request):
+        return True
+    settle = max(replicas.sticky_seconds, replicas.max_lag)
+    return time.monotonic() - cache.invalidated_at >= settle
+
+
+def stick_to_primary(request: Request, response: Response) -> None:
+    """After a write, send this client's reads to the primary for a few seconds."""
+    replicas: ReplicaSet | None = getattr(request.app.state, "replicas", None)
+    if replicas is None or replicas.sticky_seconds <= 0:
+        return
+    until = f"{time.time() + replicas.sticky_seconds:.3f}"
+    response.headers[PRIMARY_HEADER] = until
+    response.set_cookie(
+        PRIMARY_COOKIE,
+        until,
+        max_age=max(1, round(replicas.sticky_seconds)),
+        httponly=True,
+        samesite="lax",
+    )
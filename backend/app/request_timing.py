@@ -0,0 +1,118 @@
+"""Per-request timing phases, returned to clients as a ``Server-Timing`` header.
+
+Handlers mark phases with :func:`phase`; time spent in SQL is added to a
+``db`` phase automatically by the engine hooks. Browsers show the header in
+the network panel, and ``curl -I`` prints it, so a slow response can be split
+into query, count and serialization time without server access.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def header(self) -> str:
+        entries = [
+            f"{name};dur={seconds * 1000:.2f}" + (f';desc="{self.counts[name]}x"' if self.counts[name] > 1 else "")
+            for name, seconds in self.phases.items()
+        ]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(entries)
+
+
+def current_timings() -> RequestTimings | None:
+    return _current.get()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as ``name`` on the current request, if any."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Add statement time on ``engine`` to the request's ``db`` phase, and checkout time to ``pool``."""
+    sync_engine = engine.sync_engine
+
+    def _checked_out(seconds: float) -> None:
+        timings = _current.get()
+        if timings is not None:
+            timings.add("pool", seconds)
+
+    if hasattr(sync_engine.pool, "checkout_observers"):
+        sync_engine.pool.checkout_observers.append(_checked_out)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        if _current.get() is not None:
+            conn.info["timing_started"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        started = conn.info.pop("timing_started", None)
+        timings = _current.get()
+        if started is not None and timings is not None:
+            timings.add("db", time.perf_counter() - started)
+
+
+def server_timing_enabled() -> bool:
+    return os.getenv("SERVER_TIMING_ENABLED", "true").strip().lower() not in {"0", "false", "no", "off"}
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that collects phases for each request and sends them as ``Server-Timing``.
+
+    The header goes out with the response start, so for streaming responses
+    it covers the work done before the first byte.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.header().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
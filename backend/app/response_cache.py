@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+from app.conditional import CachedBody
+
+T = TypeVar("T")
+
+
+class ResponseCache:
+    """Bounded LRU of serialized responses (:class:`CachedBody`) with a per-entry TTL.
+
+    Writers bump :attr:`generation` when they invalidate. A reader captures the
+    generation before querying and passes it to :meth:`put`, so a result
+    computed before a concurrent write is never stored after it.
+    """
+
+    def __init__(self, *, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[float, CachedBody]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, key: Hashable) -> CachedBody | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, body = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: Hashable, value: CachedBody, *, generation: int) -> None:
+        if not self.enabled or generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        self.generation += 1
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class SingleFlight:
+    """Let concurrent callers asking for the same key share one in-flight load.
+
+    The first caller's ``load`` runs as a task; callers that arrive before it
+    finishes await the same task instead of starting their own query. The
+    task is shielded, so a caller that disconnects does not cancel it for the
+    others. Keys should include the cache generation, so a read that starts
+    after a write never joins a load that started before it.
+    """
+
+    def __init__(self) -> None:
+        self.leaders = 0
+        self.coalesced = 0
+        self._calls: dict[Hashable, asyncio.Task[Any]] = {}
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(load())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task[Any]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller has gone away.
+            task.exception()
+
+    def stats(self) -> dict[str, Any]:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class VehicleResponseCache:
+    """Caches for vehicle detail bodies (keyed by VIN) and list pages.
+
+    Any write can shift every list page, so lists are dropped wholesale while
+    details are dropped per VIN. Sparse-fieldset details (``?fields=``) are
+    kept with the pages, which every write clears, so they never outlive a
+    change either. Misses for the same key share one database call through
+    :attr:`flights`. :attr:`invalidated_at` lets callers hold back results
+    read from a replica that may not have the latest write yet.
+    """
+
+    def __init__(self, *, ttl: float, max_details: int, max_pages: int) -> None:
+        self.details = ResponseCache(max_entries=max_details, ttl=ttl)
+        self.pages = ResponseCache(max_entries=max_pages, ttl=ttl)
+        self.flights = SingleFlight()
+        self.invalidated_at = float("-inf")
+
+    @classmethod
+    def passthrough(cls) -> VehicleResponseCache:
+        """A cache that stores nothing and shares no loads, for reads that must not see cached data."""
+        return cls(ttl=0, max_details=0, max_pages=0)
+
+    @classmethod
+    def from_env(cls) -> VehicleResponseCache:
+        return cls(
+            ttl=float(os.getenv("VEHICLE_CACHE_TTL", "60")),
+            max_details=int(os.getenv("VEHICLE_CACHE_MAX_DETAILS", "1024")),
+            max_pages=int(os.getenv("VEHICLE_CACHE_MAX_PAGES", "256")),
+        )
+
+    def invalidate_vehicles(self, vins: list[str]) -> None:
+        for vin in vins:
+            self.details.discard(vin)
+        self.pages.clear()
+        self.invalidated_at = time.monotonic()
+
+    def clear(self) -> None:
+        self.details.clear()
+        self.pages.clear()
+        self.invalidated_at = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        return {"details": self.details.stats(), "pages": self.pages.stats(), "single_flight": self.flights.stats()}
+
+
+_cache: VehicleResponseCache | None = None
+
+
+def get_vehicle_cache() -> VehicleResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = VehicleResponseCache.from_env()
+    return _cache
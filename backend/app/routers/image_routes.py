@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.conditional import is_not_modified, not_modified_response, validator_headers
+from app.image_proxy import ImageFetchError, ImageProxy, get_image_proxy
+from app.queries.vehicle_queries import build_get_vehicle_image_url_stmt
+from app.replicas import get_read_engine
+from app.request_timing import phase
+
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+
+@router.get("/{vin}/{index}", response_class=Response)
+async def get_vehicle_image(
+    request: Request,
+    vin: str,
+    index: int = Path(..., ge=0, le=9999, description="Position in the vehicle's image_urls"),
+    w: int | None = Query(None, ge=1, le=4000, description="Target width; rounded up to a stored size"),
+    engine: AsyncEngine = Depends(get_read_engine),
+    proxy: ImageProxy = Depends(get_image_proxy),
+) -> Response:
+    """One of a vehicle's photos, served from the local image cache and optionally scaled down."""
+    async with engine.connect() as conn:
+        result = await conn.execute(build_get_vehicle_image_url_stmt(vin=vin, index=index))
+        url = result.scalar_one_or_none()
+    if not url:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found.")
+
+    try:
+        with phase("image"):
+            image = await proxy.render(url, proxy.variant_width(w))
+    except ImageFetchError as exc:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
+
+    if is_not_modified(request, image.etag, None):
+        return not_modified_response(image.etag, None, proxy.cache_control)
+    headers = validator_headers(image.etag, None, proxy.cache_control)
+    headers["X-Content-Type-Options"] = "nosniff"
+    return Response(content=image.data, media_type=image.media_type, headers=headers)
@@ -1,151 +1,626 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import asyncio
 import json
-import time
-from pathlib import Path
+from collections.abc import AsyncIterator, Hashable
+from contextlib import asynccontextmanager
 from typing import Any
 
-from pydantic import ValidationError
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
 
-from app.db import get_db_conn
+from app.bulk_export import ExportFormat, iter_vehicle_export
+from app.bulk_ingest import BulkFormatError, detect_bulk_format, ingest_vehicle_stream
+from app.change_feed import CREATED, ChangeFeed, get_change_feed, publish
+from app.conditional import (
+    CachedBody,
+    conditional_json_response,
+    get_cache_policies,
+    has_validators,
+    is_not_modified,
+    not_modified_response,
+    row_etag,
+    snapshot_etag,
+)
+from app.db import get_db_engine
+from app.event_log import EventLogger, get_event_logger
 from app.queries.vehicle_queries import (
-    build_count_vehicles_stmt,
+    VehicleFilters,
+    build_count_search_vehicles_stmt,
     build_create_vehicle_stmt,
+    build_custom_plans_stmt,
     build_get_vehicle_by_vin_stmt,
+    build_get_vehicle_version_stmt,
+    build_get_vehicles_by_vins_stmt,
+    build_list_vehicles_keyset_stmt,
     build_list_vehicles_stmt,
-    vehicle_row_to_dict,
+    build_search_vehicles_stmt,
+    build_snapshot_stmt,
+    search_max_results,
 )
+from app.pagination import Cursor, InvalidCursorError, decode_cursor, encode_cursor
+from app.replicas import get_read_cache, get_read_engine, may_fill_cache, stick_to_primary
+from app.response_cache import VehicleResponseCache, get_vehicle_cache
 from app.schemas.vehicle_schemas import (
+    BulkBatchResult,
+    BulkRowError,
+    VehicleBatchGetRequest,
+    VehicleBatchGetResponse,
+    VehicleBulkResponse,
     VehicleCreate,
     VehicleListItem,
     VehicleListResponse,
     VehicleOut,
+    VehicleSearchResponse,
+    VehicleSuggestResponse,
+)
+from app.request_timing import phase
+from app.suggest_index import SuggestIndex, get_suggest_index
+from app.serialization import (
+    dump_vehicle_detail,
+    dump_vehicle_list_page,
+    dump_vehicle_search_page,
+    dump_vehicle_suggestions,
 )
+from app.vehicle_count import CountStrategy, VehicleCounter, get_vehicle_counter
+from app.write_batcher import CreateBatcher, get_create_batcher
 
 
 router = APIRouter(prefix="/vehicles", tags=["vehicles"])
 
-LOG_PATH = Path(__file__).resolve().parents[3] / ".cursor" / "debug.log"
+MAX_BULK_ERRORS = 100
 
+LOCATION = "app/routers/vehicle_routes.py"
 
-def _debug_log(hypothesis_id: str, message: str, data: dict[str, Any]) -> None:
-    payload = {
-        "sessionId": "debug-session",
-        "runId": "run1",
-        "hypothesisId": hypothesis_id,
-        "location": "app/routers/vehicle_routes.py",
-        "message": message,
-        "data": data,
-        "timestamp": int(time.time() * 1000),
-    }
-    try:
-        with LOG_PATH.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(payload) + "\n")
-    except Exception:
-        pass
+
+def _json_response(body: bytes, *, status_code: int = status.HTTP_200_OK) -> Response:
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+@asynccontextmanager
+async def _snapshot_connection(engine: AsyncEngine) -> AsyncIterator[tuple[AsyncConnection, str]]:
+    """A connection whose statements all read one MVCC snapshot, and that snapshot's text.
+
+    Under REPEATABLE READ the page, its count and the snapshot agree, so the
+    snapshot is a valid ETag for the body built from them.
+    """
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="REPEATABLE READ")
+        snapshot = (await conn.execute(build_snapshot_stmt())).scalar_one()
+        yield conn, snapshot
+
+
+async def _page_not_modified(
+    request: Request,
+    engine: AsyncEngine,
+    cache_key: Hashable,
+    cache_control: str,
+    *,
+    total_expr: Any = None,
+) -> Response | None:
+    """``304`` if the client's page ETag was issued under the current snapshot.
+
+    ``total_expr`` is for a total the snapshot does not determine (an
+    estimate): its current value is read in the same query and keyed in.
+    """
+    if "if-none-match" not in request.headers:
+        return None
+    stmt = build_snapshot_stmt()
+    if total_expr is not None:
+        stmt = stmt.add_columns(total_expr)
+    async with engine.connect() as conn:
+        row = (await conn.execute(stmt)).one()
+    etag = snapshot_etag(row[0], cache_key if total_expr is None else (cache_key, row[1]))
+    if is_not_modified(request, etag, None):
+        return not_modified_response(etag, None, cache_control)
+    return None
+
+
+def get_vehicle_filters(
+    make: str | None = Query(None, min_length=1, description="Exact make"),
+    model: str | None = Query(None, min_length=1, description="Exact model"),
+    trim: str | None = Query(None, min_length=1, description="Exact trim"),
+    exterior_color: str | None = Query(None, min_length=1, description="Exact exterior color"),
+    interior_color: str | None = Query(None, min_length=1, description="Exact interior color"),
+    fuel_type: str | None = Query(None, min_length=1, description="Exact fuel type"),
+    transmission: str | None = Query(None, min_length=1, description="Exact transmission"),
+    min_year: int | None = Query(None, ge=1900, le=2100, description="Oldest model year"),
+    max_year: int | None = Query(None, ge=1900, le=2100, description="Newest model year"),
+    min_price: int | None = Query(None, ge=0, description="Lowest price in whole dollars"),
+    max_price: int | None = Query(None, ge=0, description="Highest price in whole dollars"),
+    min_mileage: int | None = Query(None, ge=0, description="Lowest odometer reading"),
+    max_mileage: int | None = Query(None, ge=0, description="Highest odometer reading"),
+) -> VehicleFilters:
+    for name, low, high in (
+        ("year", min_year, max_year),
+        ("price", min_price, max_price),
+        ("mileage", min_mileage, max_mileage),
+    ):
+        if low is not None and high is not None and low > high:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"min_{name} must not exceed max_{name}.",
+            )
+    return VehicleFilters(
+        make=make,
+        model=model,
+        trim=trim,
+        exterior_color=exterior_color,
+        interior_color=interior_color,
+        fuel_type=fuel_type,
+        transmission=transmission,
+        min_year=min_year,
+        max_year=max_year,
+        min_price=min_price,
+        max_price=max_price,
+        min_mileage=min_mileage,
+        max_mileage=max_mileage,
+    )
+
+
+def _parse_fields(raw: str | None, model: type[BaseModel]) -> tuple[str, ...] | None:
+    """Requested ``model`` fields in model order, always with vin; None means all of them."""
+    if raw is None:
+        return None
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = requested - model.model_fields.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(model.model_fields)}.",
+        )
+    requested.add("vin")
+    fields = tuple(name for name in model.model_fields if name in requested)
+    # Asking for everything is the full representation, and shares its cache entries.
+    return None if len(fields) == len(model.model_fields) else fields
+
+
+def get_list_fields(
+    fields: str | None = Query(
+        None,
+        description="Comma-separated item fields to return, e.g. make,model,price; vin is always included",
+    ),
+) -> tuple[str, ...] | None:
+    return _parse_fields(fields, VehicleListItem)
+
+
+def get_detail_fields(
+    fields: str | None = Query(
+        None,
+        description="Comma-separated fields to return, e.g. make,model,price; vin is always included",
+    ),
+) -> tuple[str, ...] | None:
+    return _parse_fields(fields, VehicleOut)
 
 
 @router.get("/", response_model=VehicleListResponse)
 async def list_vehicles(
-    conn: AsyncConnection = Depends(get_db_conn),
+    request: Request,
+    engine: AsyncEngine = Depends(get_read_engine),
+    counter: VehicleCounter = Depends(get_vehicle_counter),
+    cache: VehicleResponseCache = Depends(get_read_cache),
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
-) -> VehicleListResponse:
-    # region agent log
-    _debug_log("H1", "list_vehicles_start", {})
-    # endregion
-    offset = (page - 1) * page_size
-    stmt = build_list_vehicles_stmt(limit=page_size, offset=offset)
-    result = await conn.execute(stmt)
-    rows = result.fetchall()
-    # region agent log
-    _debug_log("H2", "list_vehicles_rows_fetched", {"rows_count": len(rows)})
-    # endregion
-    payloads: list[dict[str, Any]] = []
-    for index, row in enumerate(rows):
-        item_dict = vehicle_row_to_dict(row)
-        if index == 0:
-            # region agent log
-            _debug_log(
-                "H3",
-                "list_vehicles_sample_row",
-                {
-                    "vin": item_dict.get("vin"),
-                    "image_type": type(item_dict.get("image_urls")).__name__,
-                    "created_at_type": type(item_dict.get("created_at")).__name__,
-                },
-            )
-            # endregion
-        payloads.append(item_dict)
-
-    validated_items: list[VehicleListItem] = []
-    for item in payloads:
+    cursor: str | None = Query(
+        None,
+        description="Opaque keyset cursor from a previous response; takes precedence over page",
+    ),
+    filters: VehicleFilters = Depends(get_vehicle_filters),
+    fields: tuple[str, ...] | None = Depends(get_list_fields),
+) -> Response:
+    events = get_event_logger()
+    events.emit("list_vehicles_start", LOCATION)
+    position: Cursor | None = None
+    if cursor is not None:
         try:
-            validated_items.append(VehicleListItem.model_validate(item))
-        except ValidationError as exc:
-            # region agent log
-            _debug_log(
-                "H3",
-                "list_vehicles_validation_error",
-                {"errors": exc.errors(), "payload": item},
+            position = decode_cursor(cursor)
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    cache_key = (page, page_size, cursor, filters.cache_key(), fields)
+    policy = get_cache_policies().list
+    cached = cache.pages.get(cache_key)
+    if cached is not None:
+        return conditional_json_response(request, cached, policy)
+
+    # A cached or estimated total comes from process memory or pg_class, not from the
+    # page's snapshot, so it is part of the ETag; an exact count is fixed by the snapshot.
+    strategy = counter.strategy if filters.is_empty else CountStrategy.EXACT
+    if strategy is CountStrategy.EXACT:
+        response = await _page_not_modified(request, engine, cache_key, policy)
+    elif strategy is CountStrategy.ESTIMATED:
+        response = await _page_not_modified(request, engine, cache_key, policy, total_expr=counter.total_expr())
+    elif (known_total := counter.cached_total()) is not None:
+        response = await _page_not_modified(request, engine, (cache_key, known_total), policy)
+    else:
+        # The total has expired and must be counted, which is the cost a 304 would save.
+        response = None
+    if response is not None:
+        return response
+
+    generation = cache.pages.generation
+    fill = may_fill_cache(request, engine, cache)
+
+    async def load() -> CachedBody:
+        async with _snapshot_connection(engine) as (conn, snapshot):
+            body, total = await _fetch_vehicle_page(
+                conn,
+                counter,
+                events,
+                page=page,
+                page_size=page_size,
+                position=position,
+                filters=filters,
+                fields=fields,
             )
-            # endregion
-            raise
+        etag_key = cache_key if strategy is CountStrategy.EXACT else (cache_key, total)
+        cached = CachedBody(body, snapshot_etag(snapshot, etag_key))
+        if fill:
+            cache.pages.put(cache_key, cached, generation=generation)
+        return cached
 
-    total_result = await conn.execute(build_count_vehicles_stmt())
-    total = total_result.scalar_one()
+    cached = await cache.flights.do(("list", cache_key, generation, engine), load)
+    return conditional_json_response(request, cached, policy)
+
+
+async def _fetch_vehicle_page(
+    conn: AsyncConnection,
+    counter: VehicleCounter,
+    events: EventLogger,
+    *,
+    page: int,
+    page_size: int,
+    position: Cursor | None,
+    filters: VehicleFilters,
+    fields: tuple[str, ...] | None,
+) -> tuple[bytes, int]:
+    """The page body and the total it reports."""
+    # One extra row tells us whether another page exists in the paging direction.
+    if position is not None:
+        stmt = build_list_vehicles_keyset_stmt(
+            limit=page_size + 1,
+            created_at=position.created_at,
+            vin=position.vin,
+            backward=position.backward,
+            filters=filters,
+            fields=fields,
+        )
+    else:
+        offset = (page - 1) * page_size
+        stmt = build_list_vehicles_stmt(limit=page_size + 1, offset=offset, filters=filters, fields=fields)
+
+    # Fold the total into the page query so a cache miss costs no extra round trip.
+    # The counter only caches or estimates the unfiltered total; filtered totals are counted (up to a cap).
+    if filters.is_empty:
+        total = counter.cached_total()
+        total_expr = counter.total_expr()
+    else:
+        total = None
+        total_expr = counter.filtered_total_expr(filters)
+    if total is None:
+        stmt = stmt.add_columns(total_expr.label("total"))
+    with phase("query" if total is not None else "query_with_count"):
+        result = await conn.execute(stmt)
+        rows = result.fetchall()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if position is not None and position.backward:
+        rows.reverse()
+    events.emit("list_vehicles_rows_fetched", LOCATION, {"rows_count": len(rows)})
+    if rows and events.sampled("list_vehicles_sample_row"):
+        events.write(
+            "list_vehicles_sample_row",
+            LOCATION,
+            {
+                "vin": rows[0].vin,
+                "image_type": type(getattr(rows[0], "image_urls", None)).__name__,
+                "created_at_type": type(rows[0].created_at).__name__,
+            },
+        )
+
+    if total is None:
+        if rows:
+            total = rows[0].total
+        else:
+            with phase("count"):
+                total_result = await conn.execute(select(total_expr))
+                total = total_result.scalar_one()
+        if filters.is_empty:
+            counter.store(total)
+    total_is_capped = False
+    if not filters.is_empty:
+        total, total_is_capped = counter.cap_filtered(total)
     total_pages = (total + page_size - 1) // page_size if total > 0 else 1
+    if total_is_capped and position is None:
+        # Offset pages past the cap are still served; never report fewer pages than the client can see.
+        total_pages = max(total_pages, page + has_more)
 
-    # region agent log
-    _debug_log(
-        "H4",
+    events.emit(
         "list_vehicles_success",
+        LOCATION,
         {
-            "return_count": len(validated_items),
+            "return_count": len(rows),
             "total": total,
             "page": page,
             "page_size": page_size,
         },
     )
-    # endregion
-
-    return VehicleListResponse(
-        items=validated_items,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages,
+
+    # Going backward, "more" means newer rows; going forward (or by offset) it means older ones.
+    if position is None:
+        has_newer, has_older = page > 1, has_more
+    elif position.backward:
+        has_newer, has_older = has_more, True
+    else:
+        has_newer, has_older = True, has_more
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_older:
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].vin)
+        if has_newer:
+            prev_cursor = encode_cursor(rows[0].created_at, rows[0].vin, backward=True)
+
+    with phase("serialize"):
+        body = dump_vehicle_list_page(
+            rows,
+            fields,
+            total=total,
+            total_is_capped=total_is_capped,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+        )
+    return body, total
+
+
+@router.get("/search", response_model=VehicleSearchResponse)
+async def search_vehicles(
+    request: Request,
+    engine: AsyncEngine = Depends(get_read_engine),
+    cache: VehicleResponseCache = Depends(get_read_cache),
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms; supports quotes, OR and -term"),
+    page: int = Query(1, ge=1, description="Page number (1-indexed)"),
+    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+) -> Response:
+    """Full-text search, ranked by relevance among the newest matches.
+
+    Only the newest ``SEARCH_MAX_RESULTS`` matches (1000 by default) are
+    ranked and paged through. When more match, ``total_is_capped`` is true,
+    ``total`` is the cap, and older matches are not returned even if they
+    would rank higher.
+    """
+    cache_key = ("search", q, page, page_size)
+    policy = get_cache_policies().search
+    cached = cache.pages.get(cache_key)
+    if cached is not None:
+        return conditional_json_response(request, cached, policy)
+    if (response := await _page_not_modified(request, engine, cache_key, policy)) is not None:
+        return response
+
+    generation = cache.pages.generation
+    fill = may_fill_cache(request, engine, cache)
+    max_results = search_max_results()
+
+    async def load() -> CachedBody:
+        offset = (page - 1) * page_size
+        stmt = build_search_vehicles_stmt(query=q, limit=page_size, offset=offset, max_results=max_results)
+        async with _snapshot_connection(engine) as (conn, snapshot):
+            with phase("query"):
+                await conn.execute(build_custom_plans_stmt())
+                result = await conn.execute(stmt)
+                rows = result.fetchall()
+            if rows:
+                total = rows[0].total
+            elif page > 1:
+                with phase("count"):
+                    count_stmt = build_count_search_vehicles_stmt(query=q, max_results=max_results)
+                    total_result = await conn.execute(count_stmt)
+                    total = total_result.scalar_one()
+            else:
+                total = 0
+        total_is_capped = total > max_results
+        total = min(total, max_results)
+
+        with phase("serialize"):
+            body = dump_vehicle_search_page(
+                rows,
+                query=q,
+                total=total,
+                total_is_capped=total_is_capped,
+                page=page,
+                page_size=page_size,
+                total_pages=(total + page_size - 1) // page_size if total > 0 else 1,
+            )
+        cached = CachedBody(body, snapshot_etag(snapshot, cache_key))
+        if fill:
+            cache.pages.put(cache_key, cached, generation=generation)
+        return cached
+
+    cached = await cache.flights.do((cache_key, generation, engine), load)
+    return conditional_json_response(request, cached, policy)
+
+
+@router.get("/suggest", response_model=VehicleSuggestResponse)
+async def suggest_vehicles(
+    prefix: str = Query(..., min_length=1, max_length=100, description="Start of a make, a model, or a make and model"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum suggestions"),
+    index: SuggestIndex = Depends(get_suggest_index),
+) -> Response:
+    """Makes and models for typeahead, from the in-memory index; no database round trip."""
+    return _json_response(dump_vehicle_suggestions(prefix, index.suggest(prefix, limit)))
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_vehicles(
+    request: Request,
+    engine: AsyncEngine = Depends(get_read_engine),
+    fmt: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="ndjson or csv"),
+    batch_size: int = Query(1000, ge=100, le=10000, description="Rows fetched from the server-side cursor at a time"),
+    filters: VehicleFilters = Depends(get_vehicle_filters),
+) -> StreamingResponse:
+    """Stream every live vehicle in VIN order; gzip-encoded when the client accepts it."""
+    gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+    headers = {
+        "Content-Disposition": f'attachment; filename="vehicles.{fmt.value}"',
+        "Vary": "Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        iter_vehicle_export(engine, fmt=fmt, filters=filters, batch_size=batch_size, gzip=gzip),
+        media_type=fmt.media_type,
+        headers=headers,
     )
 
 
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_vehicle_changes(
+    request: Request,
+    feed: ChangeFeed | None = Depends(get_change_feed),
+) -> StreamingResponse:
+    """Push inventory changes from every worker as Server-Sent Events.
+
+    ``vehicles`` events carry ``op``, ``count`` and, for API creates, ``vins``;
+    ``resync`` means events may have been missed and the client should refetch.
+    """
+    if feed is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Change feed is disabled.")
+    return StreamingResponse(
+        _iter_change_events(request, feed),
+        media_type="text/event-stream",
+        # X-Accel-Buffering stops nginx-style proxies from holding events back.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _iter_change_events(request: Request, feed: ChangeFeed) -> AsyncIterator[bytes]:
+    # Streams end after max_stream_seconds and the client reconnects. Otherwise one
+    # idle subscriber would hold up a graceful shutdown indefinitely.
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + feed.max_stream_seconds
+    queue = feed.subscribe()
+    try:
+        yield b"retry: 3000\n: connected\n\n"
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event = await asyncio.wait_for(queue.get(), min(feed.heartbeat, remaining))
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                # Comments keep idle proxies and load balancers from closing the stream.
+                yield b": keepalive\n\n"
+            else:
+                yield event.to_sse()
+    finally:
+        feed.unsubscribe(queue)
+
+
 @router.get("/{vin}", response_model=VehicleOut)
-async def get_vehicle(vin: str, conn: AsyncConnection = Depends(get_db_conn)) -> VehicleOut:
-    stmt = build_get_vehicle_by_vin_stmt(vin=vin)
-    result = await conn.execute(stmt)
-    row = result.first()
-    if row is None:
+async def get_vehicle(
+    vin: str,
+    request: Request,
+    engine: AsyncEngine = Depends(get_read_engine),
+    cache: VehicleResponseCache = Depends(get_read_cache),
+    fields: tuple[str, ...] | None = Depends(get_detail_fields),
+) -> Response:
+    policy = get_cache_policies().detail
+    # Full bodies are invalidated per VIN; sparse ones ride along with the list pages.
+    store, key = (cache.details, vin) if fields is None else (cache.pages, ("detail", vin, fields))
+    cached = store.get(key)
+    if cached is not None:
+        return conditional_json_response(request, cached, policy)
+
+    if has_validators(request):
+        # Two narrow columns by primary key; skips the description, images and serialization.
+        async with engine.connect() as conn:
+            version = (await conn.execute(build_get_vehicle_version_stmt(vin=vin))).first()
+        if version is not None and is_not_modified(request, row_etag(version, fields), version.updated_at):
+            return not_modified_response(row_etag(version, fields), version.updated_at, policy)
+
+    generation = store.generation
+    fill = may_fill_cache(request, engine, cache)
+
+    async def load() -> CachedBody | None:
+        async with engine.connect() as conn:
+            result = await conn.execute(build_get_vehicle_by_vin_stmt(vin=vin, fields=fields))
+            row = result.first()
+        if row is None:
+            return None
+        cached = CachedBody(dump_vehicle_detail(row, fields), row_etag(row, fields), row.updated_at)
+        if fill:
+            store.put(key, cached, generation=generation)
+        return cached
+
+    cached = await cache.flights.do(("detail", vin, fields, generation, engine), load)
+    if cached is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found.")
+    return conditional_json_response(request, cached, policy)
+
+
+@router.post("/batch-get", response_model=VehicleBatchGetResponse)
+async def batch_get_vehicles(
+    request: Request,
+    payload: VehicleBatchGetRequest,
+    engine: AsyncEngine = Depends(get_read_engine),
+    cache: VehicleResponseCache = Depends(get_read_cache),
+) -> Response:
+    """Resolve up to 100 VINs at once, from the detail cache and one ``= ANY`` query."""
+    vins = list(dict.fromkeys(payload.vins))
+    bodies: dict[str, bytes] = {}
+    for vin in vins:
+        cached = cache.details.get(vin)
+        if cached is not None:
+            bodies[vin] = cached.body
 
-    return VehicleOut.model_validate(vehicle_row_to_dict(row))
+    misses = [vin for vin in vins if vin not in bodies]
+    if misses:
+        generation = cache.details.generation
+        fill = may_fill_cache(request, engine, cache)
+        async with engine.connect() as conn:
+            result = await conn.execute(build_get_vehicles_by_vins_stmt(vins=misses))
+            rows = result.fetchall()
+        for row in rows:
+            body = dump_vehicle_detail(row)
+            if fill:
+                cache.details.put(row.vin, CachedBody(body, row_etag(row), row.updated_at), generation=generation)
+            bodies[row.vin] = body
+
+    # Splice the cached detail bodies in as-is rather than re-serializing them.
+    not_found = [vin for vin in vins if vin not in bodies]
+    entries = b",".join(json.dumps(vin).encode("utf-8") + b":" + bodies.get(vin, b"null") for vin in vins)
+    return _json_response(b'{"vehicles":{' + entries + b'},"not_found":' + json.dumps(not_found).encode("utf-8") + b"}")
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=VehicleOut)
-async def create_vehicle(payload: VehicleCreate, conn: AsyncConnection = Depends(get_db_conn)) -> VehicleOut:
-    stmt = build_create_vehicle_stmt(
-        vin=payload.vin,
-        make=payload.make,
-        model=payload.model,
-        description=payload.description,
-        image_urls=payload.image_urls,
-    )
+async def create_vehicle(
+    payload: VehicleCreate,
+    request: Request,
+    engine: AsyncEngine = Depends(get_db_engine),
+    batcher: CreateBatcher | None = Depends(get_create_batcher),
+    counter: VehicleCounter = Depends(get_vehicle_counter),
+    cache: VehicleResponseCache = Depends(get_vehicle_cache),
+    suggest_index: SuggestIndex = Depends(get_suggest_index),
+) -> Response:
     try:
-        result = await conn.execute(stmt)
-        await conn.commit()
+        if batcher is not None:
+            with phase("create_batch"):
+                row = await batcher.submit(payload.model_dump())
+        else:
+            async with engine.connect() as conn:
+                result = await conn.execute(build_create_vehicle_stmt(**payload.model_dump()))
+                row = result.first()
+                if row is not None:
+                    await publish(conn, CREATED, vins=[row.vin])
+                await conn.commit()
     except IntegrityError as exc:
-        await conn.rollback()
         if getattr(exc.orig, "pgcode", None) == "23505":
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -153,10 +628,74 @@ async def create_vehicle(payload: VehicleCreate, conn: AsyncConnection = Depends
             ) from exc
         raise
 
-    row = result.first()
     if row is None:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create vehicle.")
+        # ON CONFLICT only takes over soft-deleted VINs, so no row means a live duplicate.
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Vehicle with this VIN already exists.",
+        )
+
+    counter.increment()
+    cache.invalidate_vehicles([row.vin])
+    suggest_index.add(row.make, row.model)
+    response = _json_response(dump_vehicle_detail(row), status_code=status.HTTP_201_CREATED)
+    stick_to_primary(request, response)
+    return response
+
 
-    return VehicleOut.model_validate(vehicle_row_to_dict(row))
+@router.post("/bulk", response_model=VehicleBulkResponse)
+async def bulk_create_vehicles(
+    request: Request,
+    response: Response,
+    engine: AsyncEngine = Depends(get_db_engine),
+    counter: VehicleCounter = Depends(get_vehicle_counter),
+    cache: VehicleResponseCache = Depends(get_vehicle_cache),
+    suggest_index: SuggestIndex = Depends(get_suggest_index),
+    batch_size: int = Query(1000, ge=1, le=10000, description="Rows validated and merged per transaction"),
+) -> VehicleBulkResponse:
+    """Load vehicles from a streamed NDJSON or CSV body.
 
+    Existing VINs are skipped, invalid rows are rejected with their line
+    number, and every batch commits on its own.
+    """
+    fmt = detect_bulk_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send application/x-ndjson or text/csv.",
+        )
 
+    batches: list[BulkBatchResult] = []
+    errors: list[BulkRowError] = []
+    errors_truncated = False
+    async with engine.connect() as conn:
+        try:
+            async for batch, batch_errors, added in ingest_vehicle_stream(
+                conn,
+                request.stream(),
+                fmt=fmt,
+                batch_size=batch_size,
+            ):
+                batches.append(batch)
+                if batch.inserted:
+                    counter.increment(batch.inserted)
+                    cache.invalidate_vehicles([])
+                for (make, model), count in added.items():
+                    suggest_index.add(make, model, count)
+                room = MAX_BULK_ERRORS - len(errors)
+                errors.extend(batch_errors[:room])
+                errors_truncated = errors_truncated or len(batch_errors) > room
+        except BulkFormatError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    if any(batch.inserted for batch in batches):
+        stick_to_primary(request, response)
+
+    return VehicleBulkResponse(
+        batches=batches,
+        inserted=sum(batch.inserted for batch in batches),
+        skipped=sum(batch.skipped for batch in batches),
+        rejected=sum(batch.rejected for batch in batches),
+        errors=errors,
+        errors_truncated=errors_truncated,
+    )
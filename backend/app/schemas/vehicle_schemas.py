@@ -15,6 +15,14 @@ class VehicleCreate(BaseModel):
     model: NonEmptyStr
     description: NonEmptyStr
     image_urls: list[str] = Field(default_factory=list)
+    year: Annotated[int, Field(ge=1900, le=2100)] | None = None
+    price: Annotated[int, Field(ge=0)] | None = None
+    mileage: Annotated[int, Field(ge=0)] | None = None
+    trim: NonEmptyStr | None = None
+    exterior_color: NonEmptyStr | None = None
+    interior_color: NonEmptyStr | None = None
+    fuel_type: NonEmptyStr | None = None
+    transmission: NonEmptyStr | None = None
 
     @field_validator("image_urls")
     @classmethod
@@ -36,21 +44,98 @@ class VehicleOut(BaseModel):
     model: str
     description: str
     image_urls: list[str]
+    year: int | None = None
+    price: int | None = None
+    mileage: int | None = None
+    trim: str | None = None
+    exterior_color: str | None = None
+    interior_color: str | None = None
+    fuel_type: str | None = None
+    transmission: str | None = None
     created_at: datetime | None = None
 
 
+class VehicleBatchGetRequest(BaseModel):
+    vins: list[NonEmptyStr] = Field(min_length=1, max_length=100)
+
+
+class VehicleBatchGetResponse(BaseModel):
+    """``vehicles`` has a key for every requested VIN; ``null`` means not found."""
+
+    vehicles: dict[str, VehicleOut | None]
+    not_found: list[str]
+
+
 class VehicleListItem(BaseModel):
     vin: str
     make: str
     model: str
+    year: int | None = None
+    price: int | None = None
+    mileage: int | None = None
     created_at: datetime | None = None
+    # First entry of image_urls, so a list can show thumbnails without a detail fetch per row.
+    cover_image: str | None = None
 
 
 class VehicleListResponse(BaseModel):
     items: list[VehicleListItem]
     total: int
+    # Filtered totals stop counting at VEHICLE_COUNT_FILTERED_MAX; when true,
+    # total and total_pages are lower bounds and later pages still exist.
+    total_is_capped: bool = False
     page: int
     page_size: int
     total_pages: int
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class VehicleSearchItem(VehicleListItem):
+    rank: float
+
+
+class VehicleSearchResponse(BaseModel):
+    query: str
+    items: list[VehicleSearchItem]
+    total: int
+    # Only the SEARCH_MAX_RESULTS newest matches are ranked; true when more matched.
+    total_is_capped: bool = False
+    page: int
+    page_size: int
+    total_pages: int
+
+
+class VehicleSuggestion(BaseModel):
+    """A make (``model`` is null) or a make and model, with its number of live vehicles."""
+
+    make: str
+    model: str | None = None
+    count: int
+
+
+class VehicleSuggestResponse(BaseModel):
+    prefix: str
+    suggestions: list[VehicleSuggestion]
+
+
+class BulkRowError(BaseModel):
+    line: int
+    detail: str
+
+
+class BulkBatchResult(BaseModel):
+    batch: int
+    received: int
+    inserted: int
+    skipped: int
+    rejected: int
 
 
+class VehicleBulkResponse(BaseModel):
+    batches: list[BulkBatchResult]
+    inserted: int
+    skipped: int
+    rejected: int
+    errors: list[BulkRowError]
+    errors_truncated: bool = False
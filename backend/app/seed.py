@@ -3,55 +3,185 @@ from __future__ import annotations
 import argparse
 import asyncio
 import csv
+import json
+import logging
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+from app.bulk_ingest import copy_and_merge_records, iter_record_chunks, split_photo_urls
 from app.db import create_engine
-from app.queries.vehicle_queries import vehicles_table
-from sqlalchemy.dialects.postgresql import insert
+from app.feed_sync import sync_feed
+from app.synthetic import iter_synthetic_vehicles
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_CSV_PATH = Path(__file__).resolve().parents[2] / "assets" / "swe_technical_assessment_data.csv"
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_WORKERS = 4
+
+
+def _feed_int(raw: str | None) -> int | None:
+    try:
+        return int((raw or "").strip().replace(",", ""))
+    except ValueError:
+        return None
+
 
+def _feed_text(raw: str | None) -> str | None:
+    return (raw or "").strip() or None
 
-def _read_csv_rows(csv_path: Path, limit: int | None) -> list[dict[str, Any]]:
-    rows: list[dict[str, Any]] = []
+
+def _iter_csv_rows(csv_path: Path, limit: int | None) -> Iterator[dict[str, Any]]:
     with csv_path.open(newline="", encoding="utf-8") as handle:
         reader = csv.DictReader(handle)
         for idx, row in enumerate(reader):
             if limit is not None and idx >= limit:
                 break
-            photo_urls_raw = row.get("PhotoURLs", "") or ""
-            image_urls = [item.strip() for item in photo_urls_raw.split(",") if item.strip()]
-            rows.append(
-                {
-                    "vin": row.get("VIN", "").strip(),
-                    "make": row.get("Make", "").strip(),
-                    "model": row.get("Model", "").strip(),
-                    "description": row.get("WebAdDescription", "").strip(),
-                    "image_urls": image_urls,
-                }
-            )
-    return [item for item in rows if item["vin"]]
+            vin = (row.get("VIN") or "").strip()
+            if not vin:
+                continue
+            yield {
+                "vin": vin,
+                "make": (row.get("Make") or "").strip(),
+                "model": (row.get("Model") or "").strip(),
+                "description": (row.get("WebAdDescription") or "").strip(),
+                "image_urls": split_photo_urls(row.get("PhotoURLs") or ""),
+                "year": _feed_int(row.get("Year")),
+                "price": _feed_int(row.get("Price")),
+                "mileage": _feed_int(row.get("Mileage")),
+                "trim": _feed_text(row.get("Trim")),
+                "exterior_color": _feed_text(row.get("Exterior Color")),
+                "interior_color": _feed_text(row.get("Interior Color")),
+                "fuel_type": _feed_text(row.get("Fuel Type")),
+                "transmission": _feed_text(row.get("Transmission")),
+            }
 
 
-async def seed(csv_path: Path, limit: int | None) -> None:
-    engine = create_engine()
-    to_insert = _read_csv_rows(csv_path, limit)
-    if not to_insert:
-        print("No rows to insert from CSV.")
-        return
-
-    stmt = (
-        insert(vehicles_table)
-        .values(to_insert)
-        .on_conflict_do_nothing(index_elements=[vehicles_table.c.vin])
+class SeedCheckpoint:
+    """Append-only log of committed chunk numbers for resuming a failed run.
+
+    The first line pins the source and chunk size, because chunk numbers only
+    mean the same rows when both are unchanged.
+    """
+
+    def __init__(self, path: Path, *, source: str, chunk_size: int) -> None:
+        self.path = path
+        self.header = {"source": source, "chunk_size": chunk_size}
+
+    def load(self) -> set[int]:
+        if not self.path.exists():
+            with self.path.open("w", encoding="utf-8") as handle:
+                handle.write(json.dumps(self.header) + "\n")
+            return set()
+        with self.path.open(encoding="utf-8") as handle:
+            header = json.loads(handle.readline() or "{}")
+            if header != self.header:
+                raise RuntimeError(
+                    f"Checkpoint {self.path} was written for {header}; refusing to resume {self.header}."
+                )
+            return {json.loads(line)["chunk"] for line in handle if line.strip()}
+
+    def mark_done(self, chunk_no: int, inserted: int) -> None:
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps({"chunk": chunk_no, "inserted": inserted}) + "\n")
+
+
+@dataclass
+class SeedResult:
+    rows: int = 0
+    inserted: int = 0
+    resumed_rows: int = 0
+    failed_chunks: list[int] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+async def seed(
+    rows: Iterable[dict[str, Any]],
+    *,
+    source: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    retries: int = 2,
+    checkpoint_path: Path | None = None,
+    progress_interval: float = 5.0,
+) -> SeedResult:
+    """Stream ``rows`` into ``vehicles`` in chunks over ``workers`` connections.
+
+    Chunks are produced on a worker thread, queued with back-pressure and
+    written with COPY + ``ON CONFLICT DO NOTHING``, so memory is bounded by
+    ``chunk_size * workers`` and re-running is always safe. A chunk that still
+    fails after ``retries`` is reported and left out of the checkpoint, so a
+    rerun with the same checkpoint only redoes the missing chunks.
+    """
+    checkpoint = (
+        SeedCheckpoint(checkpoint_path, source=source, chunk_size=chunk_size) if checkpoint_path else None
     )
+    done = checkpoint.load() if checkpoint else set()
+
+    engine = create_engine()
+    result = SeedResult()
+    queue: asyncio.Queue[tuple[int, list[tuple[Any, ...]]] | None] = asyncio.Queue(maxsize=workers * 2)
+    started = time.perf_counter()
+
+    async def produce() -> None:
+        chunks = iter_record_chunks(rows, chunk_size)
+        chunk_no = 0
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            chunk_no += 1
+            if chunk_no in done:
+                result.resumed_rows += len(chunk)
+                continue
+            await queue.put((chunk_no, chunk))
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def write() -> None:
+        while (item := await queue.get()) is not None:
+            chunk_no, records = item
+            for attempt in range(retries + 1):
+                try:
+                    async with engine.connect() as conn:
+                        added = await copy_and_merge_records(conn, records)
+                except Exception:  # noqa: BLE001
+                    if attempt == retries:
+                        logger.exception("Chunk %d failed after %d attempt(s)", chunk_no, attempt + 1)
+                        result.failed_chunks.append(chunk_no)
+                        break
+                    await asyncio.sleep(0.5 * 2**attempt)
+                else:
+                    result.rows += len(records)
+                    result.inserted += sum(added.values())
+                    if checkpoint:
+                        checkpoint.mark_done(chunk_no, inserted)
+                    break
 
-    async with engine.begin() as conn:
-        result = await conn.execute(stmt)
-        inserted = result.rowcount or 0
-    await engine.dispose()
-    print(f"Inserted {inserted} vehicle(s).")
+    async def report() -> None:
+        while True:
+            await asyncio.sleep(progress_interval)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{result.rows} row(s) written, {result.inserted} inserted, "
+                f"{result.rows / elapsed:,.0f} rows/s",
+                flush=True,
+            )
+
+    reporter = asyncio.create_task(report())
+    try:
+        await asyncio.gather(produce(), *(write() for _ in range(workers)))
+    finally:
+        reporter.cancel()
+        result.elapsed = time.perf_counter() - started
+        await engine.dispose()
+
+    result.failed_chunks.sort()
+    return result
 
 
 def parse_args() -> argparse.Namespace:
@@ -65,15 +195,123 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--limit",
         type=int,
-        default=5,
-        help="Number of rows to import (default: 5; use -1 for all).",
+        default=None,
+        help="Number of rows to import (default: 5; use -1 for all). Not allowed with --sync.",
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help=(
+            "Treat the CSV as the full inventory: insert new VINs, update changed ones and "
+            "soft-delete VINs missing from the feed."
+        ),
+    )
+    parser.add_argument(
+        "--max-delete-fraction",
+        type=float,
+        default=0.2,
+        help="With --sync, skip soft-deletes if they would remove more than this share of live vehicles (default: 0.2).",
+    )
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        metavar="N",
+        help="Generate N synthetic vehicles instead of reading the CSV (for benchmarking).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Rows per COPY chunk and transaction (default: {DEFAULT_CHUNK_SIZE}).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent database connections writing chunks (default: {DEFAULT_WORKERS}).",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="Extra attempts for a failed chunk before giving up on it (default: 2).",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="File recording committed chunks; rerun with the same file to resume.",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between progress lines (default: 5).",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.sync and (args.limit is not None or args.synthetic is not None):
+        parser.error("--sync reads the whole CSV; it cannot be combined with --limit or --synthetic.")
+    return args
 
 
-if __name__ == "__main__":
-    args = parse_args()
-    limit_value = None if args.limit is None or args.limit < 0 else args.limit
-    asyncio.run(seed(args.csv_path, limit_value))
+def _run_sync(args: argparse.Namespace) -> None:
+    outcome = asyncio.run(
+        sync_feed(
+            _iter_csv_rows(args.csv_path, None),
+            chunk_size=args.chunk_size,
+            max_delete_fraction=args.max_delete_fraction,
+        )
+    )
+    print(
+        f"Synced {outcome.received} row(s) in {outcome.elapsed:.1f}s: {outcome.inserted} inserted, "
+        f"{outcome.updated} updated, {outcome.unchanged} unchanged, {outcome.deleted} soft-deleted."
+    )
+    if outcome.deletes_skipped:
+        print(
+            f"Skipped soft-deleting {outcome.pending_deletes} vehicle(s) missing from the feed; "
+            "raise --max-delete-fraction if this is expected."
+        )
+        raise SystemExit(1)
 
 
+def _run_seed(args: argparse.Namespace) -> None:
+    if args.synthetic is not None:
+        rows: Iterable[dict[str, Any]] = iter_synthetic_vehicles(args.synthetic)
+        source = f"synthetic:{args.synthetic}"
+    else:
+        limit_value = 5 if args.limit is None else (None if args.limit < 0 else args.limit)
+        rows = _iter_csv_rows(args.csv_path, limit_value)
+        source = f"{args.csv_path.resolve()}:{limit_value}"
+
+    outcome = asyncio.run(
+        seed(
+            rows,
+            source=source,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            retries=args.retries,
+            checkpoint_path=args.checkpoint,
+            progress_interval=args.progress_interval,
+        )
+    )
+    if outcome.resumed_rows:
+        print(f"Skipped {outcome.resumed_rows} row(s) already committed per checkpoint.")
+    print(
+        f"Inserted {outcome.inserted} vehicle(s) from {outcome.rows} row(s) "
+        f"in {outcome.elapsed:.1f}s ({outcome.rows_per_second:,.0f} rows/s)."
+    )
+    if outcome.failed_chunks:
+        hint = (
+            "Rerun with the same --checkpoint to retry only those chunks."
+            if args.checkpoint
+            else "Rerun to retry; rows that were already inserted are skipped."
+        )
+        print(f"{len(outcome.failed_chunks)} chunk(s) failed: {outcome.failed_chunks}. {hint}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.sync:
+        _run_sync(args)
+    else:
+        _run_seed(args)
@@ -0,0 +1,92 @@
+"""Serialize query rows straight to JSON bytes.
+
+Rows from ``vehicles`` are already typed by the table definition, so the
+response models are only used for their shape: each one is mirrored as a
+``TypedDict`` whose ``TypeAdapter`` writes row mappings with pydantic-core's
+serializer, skipping per-item model validation. Keys are written in row order, and the
+query builders select columns in model field order, so the output is
+byte-for-byte what ``model_dump_json`` produces for the same data.
+
+Sparse fieldsets (``?fields=``) get their own shapes, built once per distinct
+field tuple; callers pass fields normalized to model order.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any
+
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+from app.schemas.vehicle_schemas import (
+    VehicleListItem,
+    VehicleListResponse,
+    VehicleOut,
+    VehicleSearchItem,
+    VehicleSearchResponse,
+    VehicleSuggestion,
+    VehicleSuggestResponse,
+)
+
+
+def _row_shape(model: type[BaseModel], only: tuple[str, ...] | None = None, **overrides: Any) -> Any:
+    """``TypedDict`` with the fields of ``model`` (or just ``only``); keys not in it are dropped on dump."""
+    fields = {
+        name: overrides.get(name, info.annotation)
+        for name, info in model.model_fields.items()
+        if only is None or name in only
+    }
+    return TypedDict(f"{model.__name__}Row", fields)  # type: ignore[operator]
+
+
+_detail = TypeAdapter(_row_shape(VehicleOut))
+_list_page = TypeAdapter(_row_shape(VehicleListResponse, items=list[_row_shape(VehicleListItem)]))
+_search_page = TypeAdapter(_row_shape(VehicleSearchResponse, items=list[_row_shape(VehicleSearchItem)]))
+_suggestions = TypeAdapter(_row_shape(VehicleSuggestResponse, suggestions=list[_row_shape(VehicleSuggestion)]))
+
+
+@lru_cache(maxsize=64)
+def _sparse_detail(fields: tuple[str, ...]) -> TypeAdapter[Any]:
+    return TypeAdapter(_row_shape(VehicleOut, fields))
+
+
+@lru_cache(maxsize=64)
+def _sparse_list_page(fields: tuple[str, ...]) -> TypeAdapter[Any]:
+    return TypeAdapter(_row_shape(VehicleListResponse, items=list[_row_shape(VehicleListItem, fields)]))
+
+
+def dump_vehicle_detail(row: Any, fields: tuple[str, ...] | None = None) -> bytes:
+    """``VehicleOut`` JSON for a row selected with the detail columns, or only ``fields`` of it."""
+    adapter = _detail if fields is None else _sparse_detail(fields)
+    return adapter.dump_json(row._asdict())
+
+
+def dump_vehicle_details(rows: Sequence[Any]) -> list[bytes]:
+    return [_detail.dump_json(row._asdict()) for row in rows]
+
+
+def _page_payload(model: type[BaseModel], rows: Sequence[Any], page: dict[str, Any]) -> dict[str, Any]:
+    # Typed dicts serialize in insertion order, so follow the model's field order.
+    page["items"] = [row._asdict() for row in rows]
+    return {name: page[name] for name in model.model_fields}
+
+
+def dump_vehicle_list_page(rows: Sequence[Any], fields: tuple[str, ...] | None = None, **page: Any) -> bytes:
+    """``VehicleListResponse`` JSON; ``page`` holds every field except ``items``.
+
+    With ``fields``, items carry only those ``VehicleListItem`` fields.
+    """
+    adapter = _list_page if fields is None else _sparse_list_page(fields)
+    return adapter.dump_json(_page_payload(VehicleListResponse, rows, page))
+
+
+def dump_vehicle_search_page(rows: Sequence[Any], **page: Any) -> bytes:
+    """``VehicleSearchResponse`` JSON; ``page`` holds every field except ``items``."""
+    return _search_page.dump_json(_page_payload(VehicleSearchResponse, rows, page))
+
+
+def dump_vehicle_suggestions(prefix: str, suggestions: list[dict[str, Any]]) -> bytes:
+    """``VehicleSuggestResponse`` JSON for entries in ``VehicleSuggestion`` field order."""
+    return _suggestions.dump_json({"prefix": prefix, "suggestions": suggestions})
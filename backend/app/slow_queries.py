@@ -0,0 +1,170 @@
+"""Capture statements slower than a threshold, with their plans, in a bounded ring buffer.
+
+The timing hook only notes the statement; ``EXPLAIN (ANALYZE, BUFFERS)`` runs
+afterwards in a background task on its own pooled connection, so the slow
+request is not made slower. ``EXPLAIN ANALYZE`` executes the statement again,
+so only read-only statements are explained, and at most one at a time: while
+the database is struggling, further captures are stored without a plan.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import os
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+MAX_PARAMETERS_CHARS = 1000
+
+# Statements that are safe to run a second time under EXPLAIN ANALYZE.
+_EXPLAINABLE = ("SELECT", "WITH", "VALUES", "TABLE")
+
+# Writes hidden inside an otherwise explainable statement: data-modifying CTEs,
+# SELECT INTO, row locks, and functions whose side effects survive a rollback
+# (notifications are sent, sequences advance, session advisory locks are held).
+_SIDE_EFFECTS = re.compile(
+    r"\b(?:INSERT|UPDATE|DELETE|MERGE|INTO)\b"
+    r"|\bFOR\s+(?:NO\s+KEY\s+)?UPDATE\b|\bFOR\s+(?:KEY\s+)?SHARE\b"
+    r"|\b(?:PG_NOTIFY|NEXTVAL|SETVAL|PG_ADVISORY\w*|PG_TRY_ADVISORY\w*|SET_CONFIG|LO_\w+|DBLINK\w*)\s*\(",
+    re.IGNORECASE,
+)
+
+
+def _is_read_only(statement: str) -> bool:
+    head = statement.lstrip().upper()
+    return head.startswith(_EXPLAINABLE) and _SIDE_EFFECTS.search(head) is None
+
+
+class SlowQueryLog:
+    def __init__(self, *, threshold_ms: float = 200.0, capacity: int = 50, explain: bool = True) -> None:
+        self.threshold = threshold_ms / 1000
+        self.capacity = capacity
+        self.explain = explain
+        self.entries: deque[dict[str, Any]] = deque(maxlen=capacity)
+        self.captured = 0
+        self.explains_skipped = 0
+        # Sync engine (as seen by the cursor hooks) -> async engine to EXPLAIN on.
+        self._engines: dict[Any, AsyncEngine] = {}
+        self._explaining = False
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @classmethod
+    def from_env(cls) -> SlowQueryLog:
+        return cls(
+            threshold_ms=float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200")),
+            capacity=int(os.getenv("SLOW_QUERY_LOG_SIZE", "50")),
+            explain=os.getenv("SLOW_QUERY_EXPLAIN", "true").strip().lower() not in {"0", "false", "no", "off"},
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold >= 0 and self.capacity > 0
+
+    def instrument_engine(self, engine: AsyncEngine) -> None:
+        if not self.enabled:
+            return
+        sync_engine = engine.sync_engine
+        self._engines[sync_engine] = engine
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _before(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+            conn.info["slow_query_started"] = time.perf_counter()
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _after(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+            started = conn.info.pop("slow_query_started", None)
+            if started is None:
+                return
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.threshold and not statement.lstrip().upper().startswith("EXPLAIN"):
+                self._capture(statement, parameters, elapsed, executemany, self._engines.get(conn.engine))
+
+    def _capture(
+        self,
+        statement: str,
+        parameters: Any,
+        elapsed: float,
+        executemany: bool,
+        engine: AsyncEngine | None,
+    ) -> None:
+        params_text = repr(parameters)
+        if len(params_text) > MAX_PARAMETERS_CHARS:
+            params_text = params_text[:MAX_PARAMETERS_CHARS] + "..."
+        entry: dict[str, Any] = {
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(elapsed * 1000, 2),
+            "statement": statement,
+            "parameters": params_text,
+            "plan": None,
+            "plan_status": "not requested",
+        }
+        self.entries.append(entry)
+        self.captured += 1
+
+        if not self.explain or engine is None:
+            return
+        if executemany or not _is_read_only(statement):
+            entry["plan_status"] = "skipped: not a read-only statement"
+            return
+        if self._explaining:
+            entry["plan_status"] = "skipped: another EXPLAIN is running"
+            self.explains_skipped += 1
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            entry["plan_status"] = "skipped: no event loop"
+            return
+        # A fresh context keeps the EXPLAIN out of the triggering request's Server-Timing
+        # (Context().run rather than create_task(context=), which needs Python 3.11).
+        task = contextvars.Context().run(loop.create_task, self._explain(engine, entry, statement, parameters))
+        self._explaining = True
+        entry["plan_status"] = "pending"
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, engine: AsyncEngine, entry: dict[str, Any], statement: str, parameters: Any) -> None:
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                entry["plan"] = "\n".join(row[0] for row in result.fetchall())
+                await conn.rollback()
+            entry["plan_status"] = "ok"
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("EXPLAIN of slow query failed: %s", exc)
+            entry["plan_status"] = f"failed: {exc}"
+        finally:
+            self._explaining = False
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "capacity": self.capacity,
+            "captured": self.captured,
+            "explains_skipped": self.explains_skipped,
+            # Newest first.
+            "entries": list(reversed(self.entries)),
+        }
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+_slow_query_log: SlowQueryLog | None = None
+
+
+def get_slow_query_log() -> SlowQueryLog:
+    global _slow_query_log
+    if _slow_query_log is None:
+        _slow_query_log = SlowQueryLog.from_env()
+    return _slow_query_log
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+from typing import Any
+
+MAKES_AND_MODELS: dict[str, tuple[str, ...]] = {
+    "Toyota": ("Camry", "Corolla", "RAV4", "Highlander", "Tacoma", "Tundra"),
+    "Honda": ("Civic", "Accord", "CR-V", "Pilot", "Odyssey"),
+    "Ford": ("F150 SuperCrew Cab", "Mustang", "Explorer", "Escape", "Bronco"),
+    "Chevrolet": ("Silverado 1500", "Equinox", "Tahoe", "Malibu", "Camaro"),
+    "Jeep": ("Wrangler", "Grand Cherokee", "Compass", "Gladiator"),
+    "Nissan": ("Altima", "Rogue", "Sentra", "Frontier"),
+    "GMC": ("Sierra 1500 Crew Cab", "Yukon", "Acadia"),
+    "INFINITI": ("QX50", "QX55", "Q50"),
+    "Acura": ("MDX", "RDX", "TLX", "NSX"),
+    "Tesla": ("Model 3", "Model Y", "Model S"),
+}
+
+_MAKES = tuple(MAKES_AND_MODELS)
+
+_COLORS = ("Black", "White", "Silver", "Gray", "Blue", "Red", "Green", "Brown")
+_TRIMS = ("Base", "S", "SE", "SEL", "Limited", "Sport", "Touring", "Platinum")
+_FUEL_TYPES = ("Gasoline", "Gasoline", "Gasoline", "Hybrid", "Diesel", "Electric")
+
+_WORDS = (
+    "clean", "carfax", "one-owner", "leather", "seats", "heated", "navigation", "backup",
+    "camera", "bluetooth", "sunroof", "alloy", "wheels", "low", "miles", "warranty",
+    "financing", "available", "excellent", "condition", "well", "maintained", "service",
+    "records", "premium", "sound", "system", "all-wheel", "drive", "towing", "package",
+    "keyless", "entry", "remote", "start", "lane", "assist", "adaptive", "cruise",
+)
+
+
+def synthetic_vin(index: int) -> str:
+    """Deterministic 17-character VIN for synthetic row ``index``."""
+    return f"SYN{index:014d}"
+
+
+def iter_synthetic_vehicles(
+    count: int,
+    *,
+    start: int = 0,
+    description_words: int = 60,
+    images: int = 8,
+    seed: int = 0,
+) -> Iterator[dict[str, Any]]:
+    """Yield ``count`` fake vehicles shaped like seeder rows.
+
+    VINs depend only on the row index, so repeated runs address the same
+    rows; everything else (model, year, price, mileage, trim, colors, fuel
+    type and description text) is drawn from ``seed``.
+    """
+    rng = random.Random(seed + start)
+    for index in range(start, start + count):
+        make = _MAKES[index % len(_MAKES)]
+        model = rng.choice(MAKES_AND_MODELS[make])
+        vin = synthetic_vin(index)
+        year = rng.randint(2005, 2025)
+        yield {
+            "vin": vin,
+            "make": make,
+            "model": model,
+            "description": " ".join(rng.choices(_WORDS, k=description_words)),
+            "image_urls": [f"https://images.example.com/{vin}/{n}.jpg" for n in range(images)],
+            "year": year,
+            "price": rng.randint(30, 900) * 100 - 1,
+            "mileage": max(0, int(rng.gauss(12_000, 4_000) * (2026 - year))),
+            "trim": rng.choice(_TRIMS),
+            "exterior_color": rng.choice(_COLORS),
+            "interior_color": rng.choice(_COLORS[:4]),
+            "fuel_type": "Electric" if make == "Tesla" else rng.choice(_FUEL_TYPES),
+            "transmission": "Manual" if rng.random() < 0.05 else "Automatic",
+        }
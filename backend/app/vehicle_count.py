@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+import time
+from enum import Enum
+from typing import Any
+
+from app.queries.vehicle_queries import (
+    VehicleFilters,
+    build_capped_count_vehicles_expr,
+    build_estimated_count_vehicles_expr,
+    build_exact_count_vehicles_expr,
+)
+
+
+class CountStrategy(str, Enum):
+    EXACT = "exact"
+    CACHED = "cached"
+    ESTIMATED = "estimated"
+
+
+class VehicleCounter:
+    """Decides how ``list_vehicles`` obtains the inventory total.
+
+    - ``exact``: ``count(*)`` on every request.
+    - ``cached``: ``count(*)`` on a miss, then served from memory until the TTL
+      expires. Writes on this process keep it current via :meth:`increment`
+      and :meth:`invalidate`; the TTL bounds drift caused by other processes.
+    - ``estimated``: ``pg_class.reltuples`` once the table holds at least
+      ``estimate_min_rows`` rows, exact below that.
+
+    Filtered totals are always counted, but only up to ``filtered_max``: a
+    broad filter would otherwise count most of the table on every page.
+    """
+
+    def __init__(
+        self,
+        strategy: CountStrategy = CountStrategy.CACHED,
+        *,
+        cache_ttl: float = 30.0,
+        estimate_min_rows: int = 100_000,
+        filtered_max: int = 1_000,
+    ) -> None:
+        self.strategy = strategy
+        self.cache_ttl = cache_ttl
+        self.estimate_min_rows = estimate_min_rows
+        self.filtered_max = filtered_max
+        self._total: int | None = None
+        self._stored_at = 0.0
+
+    @classmethod
+    def from_env(cls) -> VehicleCounter:
+        raw_strategy = os.getenv("VEHICLE_COUNT_STRATEGY", CountStrategy.CACHED.value).strip().lower()
+        try:
+            strategy = CountStrategy(raw_strategy)
+        except ValueError as exc:
+            choices = ", ".join(item.value for item in CountStrategy)
+            raise RuntimeError(f"VEHICLE_COUNT_STRATEGY must be one of: {choices}.") from exc
+        return cls(
+            strategy,
+            cache_ttl=float(os.getenv("VEHICLE_COUNT_CACHE_TTL", "30")),
+            estimate_min_rows=int(os.getenv("VEHICLE_COUNT_ESTIMATE_MIN_ROWS", "100000")),
+            filtered_max=int(os.getenv("VEHICLE_COUNT_FILTERED_MAX", "1000")),
+        )
+
+    def cached_total(self) -> int | None:
+        """Return the remembered total, or ``None`` when it must be queried."""
+        if self.strategy is not CountStrategy.CACHED or self._total is None:
+            return None
+        if time.monotonic() - self._stored_at > self.cache_ttl:
+            self._total = None
+            return None
+        return self._total
+
+    def total_expr(self) -> Any:
+        """Scalar SQL expression yielding the total under the current strategy."""
+        if self.strategy is CountStrategy.ESTIMATED:
+            return build_estimated_count_vehicles_expr(min_rows=self.estimate_min_rows)
+        return build_exact_count_vehicles_expr()
+
+    def filtered_total_expr(self, filters: VehicleFilters) -> Any:
+        """Scalar SQL expression counting filtered rows up to ``filtered_max + 1``.
+
+        The extra row tells :meth:`cap_filtered` whether the cap was reached.
+        """
+        return build_capped_count_vehicles_expr(filters, cap=self.filtered_max + 1)
+
+    def cap_filtered(self, counted: int) -> tuple[int, bool]:
+        """The filtered total to report for ``counted`` rows, and whether it is capped."""
+        if counted > self.filtered_max:
+            return self.filtered_max, True
+        return counted, False
+
+    def store(self, total: int) -> None:
+        if self.strategy is CountStrategy.CACHED:
+            self._total = total
+            self._stored_at = time.monotonic()
+
+    def increment(self, amount: int = 1) -> None:
+        if self._total is not None:
+            self._total += amount
+
+    def invalidate(self) -> None:
+        self._total = None
+
+
+_counter: VehicleCounter | None = None
+
+
+def get_vehicle_counter() -> VehicleCounter:
+    global _counter
+    if _counter is None:
+        _counter = VehicleCounter.from_env()
+    return _counter
@@ -0,0 +1,158 @@
+"""Group commit for ``POST /api/vehicles``.
+
+Creates that arrive within ``window_ms`` of each other are written by one
+multi-row ``INSERT ... RETURNING`` in one transaction: one connection, one
+round trip and one WAL flush for the whole batch instead of one each.
+Every caller still gets its own outcome. A VIN that is already live, or that
+an earlier payload in the same batch claimed, comes back as a duplicate; if
+the batch statement fails for any other reason, its payloads are retried one
+transaction each so a single bad row only fails its own request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import os
+from typing import Any
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.change_feed import CREATED, publish
+from app.queries.vehicle_queries import build_create_vehicle_stmt, build_create_vehicles_stmt
+
+logger = logging.getLogger(__name__)
+
+Pending = tuple[dict[str, Any], "asyncio.Future[Any]"]
+
+
+class CreateBatcher:
+    def __init__(self, engine: AsyncEngine, *, window_ms: float = 2.0, max_size: int = 100) -> None:
+        self.engine = engine
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self.batches = 0
+        self.rows = 0
+        self.largest = 0
+        self.fallbacks = 0
+        self._pending: list[Pending] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @classmethod
+    def from_env(cls, engine: AsyncEngine) -> CreateBatcher | None:
+        """A batcher when ``CREATE_BATCH_WINDOW_MS`` is positive, else None."""
+        window_ms = float(os.getenv("CREATE_BATCH_WINDOW_MS", "0"))
+        if window_ms <= 0:
+            return None
+        return cls(engine, window_ms=window_ms, max_size=int(os.getenv("CREATE_BATCH_MAX_SIZE", "100")))
+
+    async def submit(self, vehicle: dict[str, Any]) -> Any:
+        """Insert ``vehicle`` with the current batch; returns its row, or None if the VIN is live."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Any] = loop.create_future()
+        self._pending.append((vehicle, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            # A fresh context keeps batch statements out of the first caller's Server-Timing.
+            self._timer = loop.call_later(self.window, self._flush, context=contextvars.Context())
+        # If the caller goes away, only its future is cancelled; the batch is still written.
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        # Context().run rather than create_task(context=), which needs Python 3.11.
+        task = contextvars.Context().run(asyncio.get_running_loop().create_task, self._write(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, batch: list[Pending]) -> None:
+        self.batches += 1
+        self.rows += len(batch)
+        self.largest = max(self.largest, len(batch))
+
+        # The first payload for a VIN wins, exactly as if the requests had run one by one.
+        first: dict[str, Pending] = {}
+        for vehicle, future in batch:
+            if vehicle["vin"] in first:
+                _resolve(future, None)
+            else:
+                first[vehicle["vin"]] = (vehicle, future)
+
+        try:
+            async with self.engine.connect() as conn:
+                try:
+                    result = await conn.execute(build_create_vehicles_stmt([item for item, _ in first.values()]))
+                    rows = {row.vin: row for row in result}
+                    if rows:
+                        await publish(conn, CREATED, vins=rows)
+                    await conn.commit()
+                except Exception:  # noqa: BLE001
+                    await conn.rollback()
+                    self.fallbacks += 1
+                    logger.warning("Batched create of %d vehicle(s) failed; retrying one by one", len(first))
+                    await self._write_each(conn, list(first.values()))
+                    return
+        except Exception as exc:  # noqa: BLE001
+            # Could not even get a connection: every caller sees the error.
+            for _, future in first.values():
+                _fail(future, exc)
+            return
+
+        for vin, (_, future) in first.items():
+            _resolve(future, rows.get(vin))
+
+    async def _write_each(self, conn: AsyncConnection, batch: list[Pending]) -> None:
+        for vehicle, future in batch:
+            try:
+                result = await conn.execute(build_create_vehicle_stmt(**vehicle))
+                row = result.first()
+                if row is not None:
+                    await publish(conn, CREATED, vins=[row.vin])
+                await conn.commit()
+            except Exception as exc:  # noqa: BLE001
+                await conn.rollback()
+                _fail(future, exc)
+            else:
+                _resolve(future, row)
+
+    async def close(self) -> None:
+        """Write whatever is pending and wait for batches in flight."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": True,
+            "window_ms": self.window * 1000,
+            "max_size": self.max_size,
+            "batches": self.batches,
+            "rows": self.rows,
+            "largest_batch": self.largest,
+            "average_batch": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "fallbacks": self.fallbacks,
+        }
+
+
+def get_create_batcher(request: Request) -> CreateBatcher | None:
+    """The app's create batcher, or None when group commit is off."""
+    return getattr(request.app.state, "create_batcher", None)
+
+
+def _resolve(future: asyncio.Future[Any], value: Any) -> None:
+    if not future.done():
+        future.set_result(value)
+
+
+def _fail(future: asyncio.Future[Any], exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
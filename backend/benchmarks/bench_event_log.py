@@ -0,0 +1,107 @@
+"""Measure list-endpoint latency with the event log disabled, async, and synchronous.
+
+Runs the FastAPI app in-process (httpx ASGI transport) against ``DATABASE_URL``
+and compares three loggers on ``GET /api/vehicles``. The response cache is
+turned off, so every request runs the query and emits each of its events:
+
+- ``disabled``: no ``EVENT_LOG_PATH``; ``emit`` returns immediately.
+- ``async``: the queued, batched writer from ``app.event_log``.
+- ``sync``: the previous behaviour, one blocking file append per event.
+
+Usage (from ``backend/``, after seeding some rows)::
+
+    python -m benchmarks.bench_event_log --requests 2000 --concurrency 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+import app.event_log as event_log
+from app.event_log import EventLogger
+from app.main import app
+
+
+class SyncFileLogger(EventLogger):
+    """Reproduces the old ``_debug_log``: open and append on the calling thread."""
+
+    def write(self, event: str, location: str, data: dict[str, Any] | None = None) -> None:
+        payload = {"timestamp": int(time.time() * 1000), "event": event, "location": location, "data": data or {}}
+        with self.path.open("a", encoding="utf-8") as handle:  # type: ignore[union-attr]
+            handle.write(json.dumps(payload, default=str) + "\n")
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _drive(client: httpx.AsyncClient, url: str, total: int, concurrency: int) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    remaining = total
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.get(url)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+async def run(total: int, concurrency: int, page_size: int) -> None:
+    url = f"/api/vehicles/?page_size={page_size}"
+    with tempfile.TemporaryDirectory() as tmp:
+        loggers = {
+            "disabled": EventLogger(None),
+            "async": EventLogger(Path(tmp) / "async.log"),
+            "sync": SyncFileLogger(Path(tmp) / "sync.log"),
+        }
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                # Warm the pool before measuring.
+                await _drive(client, url, concurrency, concurrency)
+                print(f"{'mode':<10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+                for name, instance in loggers.items():
+                    event_log._event_logger = instance
+                    latencies, elapsed = await _drive(client, url, total, concurrency)
+                    instance.close()
+                    print(
+                        f"{name:<10}{total / elapsed:>10.0f}"
+                        f"{statistics.median(latencies) * 1000:>10.2f}"
+                        f"{_percentile(latencies, 0.95) * 1000:>10.2f}"
+                        f"{_percentile(latencies, 0.99) * 1000:>10.2f}"
+                    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark list latency under each event logger.")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per mode (default: 2000).")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients (default: 32).")
+    parser.add_argument("--page-size", type=int, default=20, help="page_size query parameter (default: 20).")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    # Cache hits skip the query and most events. Read when the app first builds
+    # its cache, so this must happen before the lifespan runs.
+    os.environ["VEHICLE_CACHE_TTL"] = "0"
+    asyncio.run(run(args.requests, args.concurrency, args.page_size))
@@ -0,0 +1,88 @@
+"""Check that filtered listings use the feed-column indexes and time them.
+
+Seeds synthetic vehicles (if fewer than ``--rows`` are present), then runs
+``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` on the first list page for a set
+of filter combinations and reports the scan types, buffers touched and
+execution time of each. The statement is the one ``GET /api/vehicles``
+runs, with the filtered total (capped at ``VEHICLE_COUNT_FILTERED_MAX``)
+folded in; ``--page-only`` drops the total.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_filters --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from typing import Any
+
+from sqlalchemy.dialects import postgresql
+
+from app.db import create_engine
+from app.queries.vehicle_queries import VehicleFilters, build_count_vehicles_stmt, build_list_vehicles_stmt
+from app.seed import seed
+from app.synthetic import iter_synthetic_vehicles
+from app.vehicle_count import VehicleCounter
+
+CASES: dict[str, VehicleFilters] = {
+    "price range": VehicleFilters(min_price=20_000, max_price=25_000),
+    "mileage ceiling": VehicleFilters(max_mileage=10_000),
+    "year range": VehicleFilters(min_year=2023, max_year=2024),
+    "make + model + year": VehicleFilters(make="Toyota", model="RAV4", min_year=2020),
+    "fuel type + price": VehicleFilters(fuel_type="Electric", max_price=30_000),
+    "price + mileage + year": VehicleFilters(max_price=15_000, max_mileage=60_000, min_year=2015),
+}
+
+
+def _scan_nodes(plan: dict[str, Any]) -> list[str]:
+    nodes: list[str] = []
+    if "Scan" in plan["Node Type"]:
+        nodes.append(f"{plan['Node Type']}({plan.get('Index Name') or plan.get('Relation Name')})")
+    for child in plan.get("Plans", []):
+        nodes.extend(_scan_nodes(child))
+    return nodes
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Live vehicles to ensure before measuring.")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--page-only", action="store_true", help="Leave the filtered total out of the page query.")
+    args = parser.parse_args()
+
+    engine = create_engine()
+    counter = VehicleCounter.from_env()
+    try:
+        async with engine.connect() as conn:
+            live = (await conn.execute(build_count_vehicles_stmt())).scalar_one()
+        if live < args.rows:
+            print(f"Seeding {args.rows - live} synthetic vehicle(s)...", flush=True)
+            await seed(iter_synthetic_vehicles(args.rows), source=f"synthetic:{args.rows}", progress_interval=30)
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("ANALYZE vehicles")
+            await conn.commit()
+
+            print(f"{'case':<26}{'ms':>10}{'buffers':>10}  scans")
+            for name, filters in CASES.items():
+                stmt = build_list_vehicles_stmt(limit=args.page_size + 1, offset=0, filters=filters)
+                if not args.page_only:
+                    stmt = stmt.add_columns(counter.filtered_total_expr(filters).label("total"))
+                sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+                result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+                raw = result.scalar_one()
+                explain = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+                plan = explain["Plan"]
+                buffers = plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+                scans = ", ".join(_scan_nodes(plan))
+                print(f"{name:<26}{explain['Execution Time']:>10.2f}{buffers:>10}  {scans}")
+                if "Seq Scan(vehicles)" in scans:
+                    print("  ^ sequential scan; check that migrations are applied and the table is analyzed")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
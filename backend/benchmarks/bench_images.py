@@ -0,0 +1,149 @@
+"""Measure the image proxy against a local HTTP server standing in for the dealer's image host.
+
+Serves ``--images`` distinct photo-sized JPEGs from a throwaway origin and
+renders each at ``--width`` through :class:`app.image_proxy.ImageProxy`:
+
+- ``cold``: fetch, resize in the process pool and store, all images at once.
+- ``warm``: the same requests again, served from the disk cache.
+- ``inline``: the same resizes run directly on the event loop, for comparison.
+
+While each phase runs, a ticker measures how long the event loop was stalled,
+which is how long every other request on the worker would have waited.
+
+Usage (from ``backend/``; no database needed)::
+
+    python -m benchmarks.bench_images --images 40 --width 480 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import http.server
+import statistics
+import tempfile
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+
+from app.image_proxy import ImageProxy, ImageStore
+from app.image_resize import resize_to_jpeg
+
+
+def _write_photos(root: Path, count: int) -> int:
+    """``count`` distinct 800x600 JPEGs that compress like photos; returns the average size."""
+    sizes = []
+    for index in range(count):
+        gradient = Image.linear_gradient("L").resize((800, 600)).convert("RGB")
+        noise = Image.effect_noise((800, 600), 40 + index).convert("RGB")
+        photo = Image.blend(gradient, noise, 0.35)
+        path = root / f"photo-{index}.jpg"
+        photo.save(path, quality=90)
+        sizes.append(path.stat().st_size)
+    return sum(sizes) // count
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def _serve(root: Path) -> http.server.ThreadingHTTPServer:
+    handler = functools.partial(_QuietHandler, directory=str(root))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _measure(work: Callable[[], Awaitable[Any]]) -> tuple[float, float]:
+    """Wall time of ``work`` and the longest event-loop stall seen meanwhile, in ms."""
+    loop = asyncio.get_running_loop()
+    longest = 0.0
+    running = True
+
+    async def tick() -> None:
+        nonlocal longest
+        while running:
+            started = loop.time()
+            await asyncio.sleep(0.001)
+            longest = max(longest, loop.time() - started - 0.001)
+
+    ticker = asyncio.create_task(tick())
+    started = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - started
+    running = False
+    await ticker
+    return elapsed * 1000, longest * 1000
+
+
+async def _run(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as origin_dir, tempfile.TemporaryDirectory() as cache_dir:
+        # One extra photo warms up the resize pool outside the timings; a server pays that once.
+        average = _write_photos(Path(origin_dir), args.images + 1)
+        server = _serve(Path(origin_dir))
+        base = f"http://127.0.0.1:{server.server_port}"
+        urls = [f"{base}/photo-{index}.jpg" for index in range(args.images)]
+
+        proxy = ImageProxy(
+            ImageStore(Path(cache_dir), max_bytes=1 << 30),
+            workers=args.workers,
+            allowed_hosts=("127.0.0.1",),
+        )
+        await proxy.start()
+        width = proxy.variant_width(args.width)
+        try:
+            await proxy.render(f"{base}/photo-{args.images}.jpg", width)
+
+            results: list[Any] = []
+
+            async def render_all() -> None:
+                results[:] = await asyncio.gather(*(proxy.render(url, width) for url in urls))
+
+            cold = await _measure(render_all)
+            variant = statistics.mean(len(image.data) for image in results)
+
+            latencies = []
+
+            async def render_each() -> None:
+                for url in urls:
+                    started = time.perf_counter()
+                    await proxy.render(url, width)
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+            warm = await _measure(render_each)
+
+            originals = [Path(origin_dir, f"photo-{index}.jpg").read_bytes() for index in range(args.images)]
+
+            async def resize_inline() -> None:
+                for original in originals:
+                    resize_to_jpeg(original, width or 800, proxy.quality)
+                    await asyncio.sleep(0)
+
+            inline = await _measure(resize_inline)
+        finally:
+            await proxy.close()
+            server.shutdown()
+
+    print(f"{args.images} image(s), {average / 1024:.0f} KiB originals -> {variant / 1024:.1f} KiB at {width}px")
+    print(f"{'phase':8} {'wall ms':>9} {'max loop stall ms':>18}")
+    for name, (wall, stall) in (("cold", cold), ("warm", warm), ("inline", inline)):
+        print(f"{name:8} {wall:9.1f} {stall:18.1f}")
+    print(f"warm per image: median {statistics.median(latencies):.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=40, help="Distinct source images (default: 40)")
+    parser.add_argument("--width", type=int, default=480, help="Requested width (default: 480)")
+    parser.add_argument("--workers", type=int, default=4, help="Resize processes (default: 4)")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
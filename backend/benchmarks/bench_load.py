@@ -0,0 +1,345 @@
+"""Drive a mixed API workload at fixed concurrency levels and check it against a baseline.
+
+Seeds synthetic vehicles (if fewer than ``--rows`` are present), then, for each
+concurrency level, runs workers for ``--duration`` seconds. Each worker picks a
+scenario by weight from ``--mix``:
+
+- ``list_shallow``: one of the first pages, sometimes filtered by make.
+- ``list_deep``: an offset page deep into the table.
+- ``detail``: a random synthetic VIN.
+- ``create``: a new vehicle with a run-specific VIN (removed again afterwards).
+- ``search``: a full-text query from a fixed word list.
+
+Requests go to the app in-process over httpx's ASGI transport by default, or to
+a running server with ``--base-url``. Throughput and p50/p95/p99 latency per
+level and scenario are printed and, with ``--output``, written as JSON. Given
+``--baseline`` (an earlier ``--output`` file), the run exits non-zero when
+throughput drops or p95/p99 latency rises by more than ``--tolerance``.
+
+Usage (from ``backend/``, with ``requirements-dev.txt`` installed)::
+
+    python -m benchmarks.bench_load --rows 100000 --concurrency 8,32 --output baseline.json
+    python -m benchmarks.bench_load --rows 100000 --concurrency 8,32 --baseline baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy import delete
+
+from app.db import create_engine
+from app.queries.vehicle_queries import build_count_vehicles_stmt, vehicles_table
+from app.seed import seed
+from app.synthetic import MAKES_AND_MODELS, iter_synthetic_vehicles, synthetic_vin
+
+DEFAULT_MIX = "list_shallow=40,list_deep=10,detail=35,create=5,search=10"
+SEARCH_TERMS = ("leather", "sunroof", "navigation heated", "one-owner", "towing package", "camry", "awd OR all-wheel")
+
+# Latency comparisons need enough samples for p95/p99 to mean something.
+MIN_SAMPLES_FOR_COMPARISON = 50
+
+
+@dataclass(frozen=True)
+class Request:
+    method: str
+    url: str
+    json: dict[str, Any] | None = None
+    expected: int = 200
+
+
+class Workload:
+    """Builds requests for each scenario; every worker owns one with its own RNG."""
+
+    def __init__(self, *, rows: int, page_size: int, run_tag: str, rng: random.Random) -> None:
+        self.rows = rows
+        self.page_size = page_size
+        self.run_tag = run_tag
+        self.rng = rng
+        self.created = 0
+
+    def list_shallow(self) -> Request:
+        page = self.rng.randint(1, 5)
+        url = f"/api/vehicles/?page={page}&page_size={self.page_size}"
+        if self.rng.random() < 0.5:
+            url += f"&make={self.rng.choice(tuple(MAKES_AND_MODELS))}"
+        return Request("GET", url)
+
+    def list_deep(self) -> Request:
+        last_page = max(1, self.rows // self.page_size)
+        page = self.rng.randint(max(1, last_page // 2), last_page)
+        return Request("GET", f"/api/vehicles/?page={page}&page_size={self.page_size}")
+
+    def detail(self) -> Request:
+        return Request("GET", f"/api/vehicles/{synthetic_vin(self.rng.randrange(self.rows))}")
+
+    def create(self) -> Request:
+        self.created += 1
+        (vehicle,) = iter_synthetic_vehicles(1, start=self.rng.randrange(self.rows), seed=self.rng.randrange(2**31))
+        vehicle["vin"] = f"{self.run_tag}{self.created:05d}"
+        return Request("POST", "/api/vehicles/", json=vehicle, expected=201)
+
+    def search(self) -> Request:
+        return Request("GET", f"/api/vehicles/search?q={self.rng.choice(SEARCH_TERMS)}&page_size={self.page_size}")
+
+
+SCENARIOS: dict[str, Callable[[Workload], Request]] = {
+    "list_shallow": Workload.list_shallow,
+    "list_deep": Workload.list_deep,
+    "detail": Workload.detail,
+    "create": Workload.create,
+    "search": Workload.search,
+}
+
+
+def _parse_mix(raw: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}.")
+        mix[name] = float(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summarize(latencies: list[float], errors: int, elapsed: float) -> dict[str, Any]:
+    summary: dict[str, Any] = {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+    if latencies:
+        summary.update(
+            p50_ms=round(statistics.median(latencies) * 1000, 2),
+            p95_ms=round(_percentile(latencies, 0.95) * 1000, 2),
+            p99_ms=round(_percentile(latencies, 0.99) * 1000, 2),
+            max_ms=round(max(latencies) * 1000, 2),
+        )
+    return summary
+
+
+async def _run_level(
+    client: httpx.AsyncClient,
+    *,
+    concurrency: int,
+    duration: float,
+    mix: dict[str, float],
+    make_workload: Callable[[int], Workload],
+) -> dict[str, Any]:
+    names = list(mix)
+    weights = list(mix.values())
+    latencies: dict[str, list[float]] = {name: [] for name in names}
+    errors: dict[str, int] = dict.fromkeys(names, 0)
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int) -> None:
+        workload = make_workload(index)
+        while time.perf_counter() < deadline:
+            name = workload.rng.choices(names, weights)[0]
+            request = SCENARIOS[name](workload)
+            started = time.perf_counter()
+            try:
+                response = await client.request(request.method, request.url, json=request.json)
+                ok = response.status_code == request.expected
+            except httpx.HTTPError:
+                ok = False
+            latencies[name].append(time.perf_counter() - started)
+            if not ok:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    everything = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        **_summarize(everything, sum(errors.values()), elapsed),
+        "scenarios": {name: _summarize(latencies[name], errors[name], elapsed) for name in names},
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Regressions of ``results`` against ``baseline``, one message each."""
+    previous = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    problems: list[str] = []
+    for level in results["levels"]:
+        before = previous.get(level["concurrency"])
+        if before is None:
+            continue
+        label = f"c={level['concurrency']}"
+        if level["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            problems.append(
+                f"{label}: throughput {level['throughput_rps']} req/s < baseline {before['throughput_rps']} req/s"
+            )
+        for name, current in level["scenarios"].items():
+            old = before.get("scenarios", {}).get(name)
+            if old is None or min(current["requests"], old["requests"]) < MIN_SAMPLES_FOR_COMPARISON:
+                continue
+            for metric in ("p95_ms", "p99_ms"):
+                if current[metric] > old[metric] * (1 + tolerance):
+                    problems.append(f"{label} {name}: {metric} {current[metric]} > baseline {old[metric]}")
+    return problems
+
+
+def _print_level(level: dict[str, Any]) -> None:
+    print(f"\nconcurrency {level['concurrency']}: {level['throughput_rps']} req/s, {level['errors']} error(s)")
+    print(f"{'scenario':<14}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, summary in {**level["scenarios"], "all": level}.items():
+        if not summary["requests"]:
+            continue
+        print(
+            f"{name:<14}{summary['requests']:>10}{summary['errors']:>8}"
+            f"{summary['p50_ms']:>10.2f}{summary['p95_ms']:>10.2f}{summary['p99_ms']:>10.2f}"
+        )
+
+
+async def run(args: argparse.Namespace) -> int:
+    mix = _parse_mix(args.mix)
+    levels = [int(value) for value in args.concurrency.split(",")]
+    run_tag = f"LOAD{int(time.time()) % 10**5:05d}"
+
+    engine = create_engine()
+    try:
+        async with engine.connect() as conn:
+            live = (await conn.execute(build_count_vehicles_stmt())).scalar_one()
+        if live < args.rows:
+            print(f"Seeding {args.rows - live} synthetic vehicle(s)...", flush=True)
+            await seed(iter_synthetic_vehicles(args.rows), source=f"synthetic:{args.rows}", progress_interval=30)
+            async with engine.connect() as conn:
+                await conn.exec_driver_sql("ANALYZE vehicles")
+                await conn.commit()
+
+        workers = itertools.count()
+
+        def make_workload(index: int) -> Workload:
+            # Each worker, warmup included, gets its own VIN prefix so creates never collide.
+            return Workload(
+                rows=args.rows,
+                page_size=args.page_size,
+                run_tag=f"{run_tag}{next(workers):03d}",
+                rng=random.Random(args.seed * 1_000 + index),
+            )
+
+        results: dict[str, Any] = {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "config": {
+                "rows": args.rows,
+                "mix": mix,
+                "duration_s": args.duration,
+                "warmup_s": args.warmup,
+                "page_size": args.page_size,
+                "seed": args.seed,
+                "target": args.base_url or "in-process",
+                "response_cache": not args.no_cache,
+            },
+            "environment": {"python": platform.python_version(), "platform": platform.platform()},
+            "levels": [],
+        }
+
+        if args.base_url:
+            client_context: Any = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+            app_context: Any = None
+        else:
+            from app.main import app
+
+            transport = httpx.ASGITransport(app=app)
+            client_context = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30)
+            app_context = app.router.lifespan_context(app)
+
+        if app_context is not None:
+            await app_context.__aenter__()
+        try:
+            async with client_context as client:
+                for concurrency in levels:
+                    if args.warmup > 0:
+                        await _run_level(
+                            client, concurrency=concurrency, duration=args.warmup, mix=mix, make_workload=make_workload
+                        )
+                    level = await _run_level(
+                        client, concurrency=concurrency, duration=args.duration, mix=mix, make_workload=make_workload
+                    )
+                    results["levels"].append(level)
+                    _print_level(level)
+        finally:
+            if app_context is not None:
+                await app_context.__aexit__(None, None, None)
+
+        if "create" in mix:
+            async with engine.begin() as conn:
+                await conn.execute(delete(vehicles_table).where(vehicles_table.c.vin.startswith(run_tag)))
+    finally:
+        await engine.dispose()
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+
+    status = 0
+    for level in results["levels"]:
+        requests = level["requests"]
+        if requests and level["errors"] / requests > args.max_error_rate:
+            print(f"FAIL c={level['concurrency']}: {level['errors']} of {requests} request(s) failed")
+            status = 1
+    if args.baseline:
+        problems = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            status = 1
+        else:
+            print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+    return status
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the vehicles API and compare with a baseline.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic vehicles to ensure (default: 100000).")
+    parser.add_argument("--concurrency", default="8,32", help="Comma-separated concurrency levels (default: 8,32).")
+    parser.add_argument("--duration", type=float, default=15.0, help="Measured seconds per level (default: 15).")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before each level (default: 3).")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights (default: {DEFAULT_MIX}).")
+    parser.add_argument("--page-size", type=int, default=20, help="page_size for list and search (default: 20).")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for request generation (default: 0).")
+    parser.add_argument("--base-url", help="Load-test a running server instead of the in-process app.")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the in-process response cache.")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this path.")
+    parser.add_argument("--baseline", type=Path, help="Fail if results regress against this earlier --output.")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed relative regression (default: 0.2 = 20%%)."
+    )
+    parser.add_argument(
+        "--max-error-rate", type=float, default=0.0, help="Fail above this fraction of failed requests (default: 0)."
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.no_cache:
+        # Read when the app first builds its cache, so this must happen before the lifespan runs.
+        os.environ["VEHICLE_CACHE_TTL"] = "0"
+    sys.exit(asyncio.run(run(args)))
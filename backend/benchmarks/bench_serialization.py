@@ -0,0 +1,96 @@
+"""Compare the old and new ways of turning a page of rows into JSON bytes.
+
+Fetches one page of real rows from ``DATABASE_URL`` and times, per page:
+
+- ``validate``: ``vehicle_row_to_dict`` + ``model_validate`` per item, then the
+  response model's ``model_dump_json`` (the path before ``app.serialization``).
+- ``construct``: trusted ``model_construct`` per item, then ``model_dump_json``.
+- ``rows``: ``app.serialization`` (typed-dict ``TypeAdapter.dump_json`` on row mappings).
+
+Usage (from ``backend/``, after seeding at least ``--page-size`` rows)::
+
+    python -m benchmarks.bench_serialization --page-size 100 --iterations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+from app.db import create_engine
+from app.queries.vehicle_queries import (
+    build_get_vehicle_by_vin_stmt,
+    build_list_vehicles_stmt,
+    vehicle_row_to_dict,
+)
+from app.schemas.vehicle_schemas import VehicleListItem, VehicleListResponse, VehicleOut
+from app.serialization import dump_vehicle_detail, dump_vehicle_list_page
+
+PAGE = {"total": 1000, "page": 1, "page_size": 100, "total_pages": 10, "next_cursor": None, "prev_cursor": None}
+
+
+async def _fetch(page_size: int) -> tuple[list[Any], Any]:
+    engine = create_engine()
+    try:
+        async with engine.connect() as conn:
+            rows = (await conn.execute(build_list_vehicles_stmt(limit=page_size, offset=0))).fetchall()
+            if not rows:
+                raise SystemExit("No vehicles found; seed some first (python -m app.seed --synthetic 1000).")
+            detail = (await conn.execute(build_get_vehicle_by_vin_stmt(vin=rows[0].vin))).one()
+    finally:
+        await engine.dispose()
+    return rows, detail
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows, detail = asyncio.run(_fetch(args.page_size))
+
+    def validate() -> bytes:
+        items = [VehicleListItem.model_validate(vehicle_row_to_dict(row)) for row in rows]
+        return VehicleListResponse(items=items, **PAGE).model_dump_json().encode("utf-8")
+
+    def construct() -> bytes:
+        items = [
+            VehicleListItem.model_construct(**{name: getattr(row, name) for name in VehicleListItem.model_fields})
+            for row in rows
+        ]
+        return VehicleListResponse.model_construct(items=items, **PAGE).model_dump_json().encode("utf-8")
+
+    def from_rows() -> bytes:
+        return dump_vehicle_list_page(rows, **PAGE)
+
+    def detail_validate() -> bytes:
+        return VehicleOut.model_validate(vehicle_row_to_dict(detail)).model_dump_json().encode("utf-8")
+
+    def detail_rows() -> bytes:
+        return dump_vehicle_detail(detail)
+
+    assert validate() == construct() == from_rows(), "serializers disagree"
+    assert detail_validate() == detail_rows(), "detail serializers disagree"
+
+    cases: list[tuple[str, Callable[[], bytes]]] = [
+        (f"list/{len(rows)} validate", validate),
+        (f"list/{len(rows)} construct", construct),
+        (f"list/{len(rows)} rows", from_rows),
+        ("detail validate", detail_validate),
+        ("detail rows", detail_rows),
+    ]
+    baseline: dict[str, float] = {}
+    print(f"{'case':<22}{'us/op':>10}{'speedup':>10}")
+    for name, func in cases:
+        per_call = min(timeit.repeat(func, number=args.iterations, repeat=3)) / args.iterations * 1e6
+        group = name.split(" ")[0]
+        baseline.setdefault(group, per_call)
+        print(f"{name:<22}{per_call:>10.1f}{baseline[group] / per_call:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { VehicleGallery } from "@/components/vehicle-gallery";
 import type { VehicleOut } from "@/lib/types";
-import { getVehicle } from "@/lib/api";
+import { getVehicle, vehicleImageUrl } from "@/lib/api";
 import { cn } from "@/lib/utils";
 
 interface PageParams {
@@ -34,9 +34,16 @@ export default async function VehicleDetailPage({ params }: PageParams) {
     "https://images.unsplash.com/photo-1493238792000-8113da705763?q=80&w=900&auto=format&fit=crop",
   ];
 
-  const normalizedGallery = (vehicle.image_urls ?? []).filter((url) => Boolean(url?.trim()));
+  // Photos go through the backend's image cache; indexes are positions in image_urls.
+  const vehicleVin = vehicle.vin;
+  const photoIndexes = (vehicle.image_urls ?? []).flatMap((url, index) => (url?.trim() ? [index] : []));
 
-  const gallery = normalizedGallery.length ? normalizedGallery : fallbackGallery;
+  const gallery = photoIndexes.length
+    ? photoIndexes.map((index) => vehicleImageUrl(vehicleVin, index, 1200))
+    : fallbackGallery;
+  const thumbnails = photoIndexes.length
+    ? photoIndexes.map((index) => vehicleImageUrl(vehicleVin, index, 480))
+    : fallbackGallery;
 
   const heroImage = gallery[0] ?? fallbackGallery[0];
   const createdAt = vehicle.created_at ? new Date(vehicle.created_at).toLocaleDateString("en-US", {
@@ -198,7 +205,7 @@ export default async function VehicleDetailPage({ params }: PageParams) {
         </div>
 
         {/* Image Gallery */}
-        <VehicleGallery gallery={gallery} make={vehicle.make} model={vehicle.model} />
+        <VehicleGallery gallery={gallery} thumbnails={thumbnails} make={vehicle.make} model={vehicle.model} />
       </main>
 
       {/* Footer */}
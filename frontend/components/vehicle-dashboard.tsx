@@ -2,8 +2,8 @@
 
 import Link from "next/link";
 import { useEffect, useMemo, useState } from "react";
-import { createVehicle, listVehicles } from "@/lib/api";
-import type { PaginatedVehicles, VehicleCreate } from "@/lib/types";
+import { createVehicle, listVehicles, subscribeToVehicleChanges, suggestVehicles, vehicleImageUrl } from "@/lib/api";
+import type { PaginatedVehicles, VehicleCreate, VehicleFilters, VehicleSuggestion } from "@/lib/types";
 import { Badge } from "@/components/ui/badge";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -94,16 +94,23 @@ export default function VehicleDashboard({ initialPage, healthStatus }: VehicleD
     message: "",
     tone: null,
   });
+  const [filters, setFilters] = useState<VehicleFilters>({});
+  const [suggestQuery, setSuggestQuery] = useState("");
+  const [suggestions, setSuggestions] = useState<VehicleSuggestion[]>([]);
 
   const {
     items: vehicles = [],
     total = 0,
+    total_is_capped: totalIsCapped = false,
     page = 1,
     page_size: pageSize = 10,
     total_pages: totalPagesRaw = 1,
+    next_cursor: nextCursor = null,
   } = pageData ?? emptyPage;
 
   const totalPages = totalPagesRaw || 1;
+  // A capped total is a lower bound, so the last page is the one without a next cursor.
+  const hasNextPage = totalIsCapped ? Boolean(nextCursor) : page < totalPages;
 
   const parsedImageUrls = useMemo(() => {
     return formState.imageUrlsInput
@@ -178,14 +185,17 @@ export default function VehicleDashboard({ initialPage, healthStatus }: VehicleD
     }
   };
 
-  const handlePageChange = async (targetPage: number, options?: { resetStatus?: boolean; silent?: boolean }) => {
-    if (targetPage < 1 || targetPage > totalPages) return;
+  const handlePageChange = async (
+    targetPage: number,
+    options?: { resetStatus?: boolean; silent?: boolean; filters?: VehicleFilters }
+  ) => {
+    if (targetPage < 1 || (targetPage > totalPages && !totalIsCapped)) return;
     if (options?.resetStatus) {
       setStatusMessage({ message: "", tone: null });
     }
     setIsPageLoading(true);
     try {
-      const data = await listVehicles({ page: targetPage, pageSize });
+      const data = await listVehicles({ page: targetPage, pageSize, filters: options?.filters ?? filters });
       setPageData(data);
     } catch (error) {
       if (!options?.silent) {
@@ -223,6 +233,47 @@ export default function VehicleDashboard({ initialPage, healthStatus }: VehicleD
     fetchData();
   }, [bootstrapped, pageSize]);
 
+  // Refresh the visible page when inventory changes on any server, instead of polling.
+  useEffect(() => {
+    return subscribeToVehicleChanges(() => {
+      listVehicles({ page, pageSize, filters })
+        .then(setPageData)
+        .catch((error) => console.error("Failed to refresh vehicles:", error));
+    });
+  }, [page, pageSize, filters]);
+
+  // Typeahead: suggestions come from the backend's in-memory index, so a short debounce is enough.
+  useEffect(() => {
+    const prefix = suggestQuery.trim();
+    if (!prefix) {
+      setSuggestions([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      suggestVehicles(prefix)
+        .then((data) => {
+          if (!cancelled) setSuggestions(data.suggestions);
+        })
+        .catch(() => {
+          if (!cancelled) setSuggestions([]);
+        });
+    }, 100);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [suggestQuery]);
+
+  const applyFilters = (next: VehicleFilters) => {
+    setFilters(next);
+    setSuggestQuery("");
+    setSuggestions([]);
+    handlePageChange(1, { resetStatus: true, filters: next });
+  };
+
+  const activeFilterLabel = [filters.make, filters.model].filter(Boolean).join(" ");
+
   const rangeStart = total === 0 ? 0 : (page - 1) * pageSize + 1;
   const rangeEnd = total === 0 ? 0 : Math.min(page * pageSize, total);
 
@@ -282,6 +333,52 @@ export default function VehicleDashboard({ initialPage, healthStatus }: VehicleD
           </p>
         </div>
 
+        {/* Make / model filter */}
+        {!isInitialLoading && (
+          <div className="mb-6 flex flex-wrap items-center gap-3 animate-fade-in">
+            <div className="relative w-full max-w-sm">
+              <Input
+                value={suggestQuery}
+                onChange={(event) => setSuggestQuery(event.target.value)}
+                onKeyDown={(event) => {
+                  if (event.key === "Escape") setSuggestQuery("");
+                  if (event.key === "Enter" && suggestions.length > 0) {
+                    const [first] = suggestions;
+                    applyFilters({ make: first.make, model: first.model ?? undefined });
+                  }
+                }}
+                placeholder="Filter by make or model"
+                aria-label="Filter by make or model"
+                autoComplete="off"
+              />
+              {suggestions.length > 0 && (
+                <ul className="absolute z-30 mt-1 w-full overflow-hidden rounded-xl border border-border/50 bg-card shadow-lg">
+                  {suggestions.map((suggestion) => (
+                    <li key={`${suggestion.make}|${suggestion.model ?? ""}`}>
+                      <button
+                        type="button"
+                        onClick={() => applyFilters({ make: suggestion.make, model: suggestion.model ?? undefined })}
+                        className="flex w-full items-center justify-between px-4 py-2 text-left text-sm hover:bg-primary/10 transition-colors"
+                      >
+                        <span>
+                          {suggestion.make}
+                          {suggestion.model && <span className="font-semibold"> {suggestion.model}</span>}
+                        </span>
+                        <span className="text-xs text-muted-foreground">{suggestion.count}</span>
+                      </button>
+                    </li>
+                  ))}
+                </ul>
+              )}
+            </div>
+            {activeFilterLabel && (
+              <Button variant="outline" size="sm" onClick={() => applyFilters({})}>
+                {activeFilterLabel} ×
+              </Button>
+            )}
+          </div>
+        )}
+
         {/* Vehicle Table */}
         <div className="animate-fade-in-up stagger-3">
           {isInitialLoading ? (
@@ -310,7 +407,7 @@ export default function VehicleDashboard({ initialPage, healthStatus }: VehicleD
               <div className="flex items-center justify-between animate-fade-in">
                 <div className="flex items-center gap-3">
                   <Badge variant="default" className="hover-scale">
-                    {total} Vehicle{total !== 1 ? "s" : ""}
+                    {totalIsCapped ? `${total}+ Vehicles` : `${total} Vehicle${total !== 1 ? "s" : ""}`}
                   </Badge>
                   <span className="text-sm text-muted-foreground">
                     Showing {rangeStart}–{rangeEnd}
@@ -353,11 +450,21 @@ export default function VehicleDashboard({ initialPage, healthStatus }: VehicleD
                           </code>
                         </TableCell>
                         <TableCell>
-                          <div className="flex flex-col">
-                            <span className="font-semibold text-foreground group-hover:text-primary transition-colors duration-300">
-                              {vehicle.make} {vehicle.model}
-                            </span>
-                            <span className="text-xs text-muted-foreground">In Stock</span>
+                          <div className="flex items-center gap-3">
+                            {vehicle.cover_image && (
+                              <img
+                                src={vehicleImageUrl(vehicle.vin, 0, 160)}
+                                alt=""
+                                loading="lazy"
+                                className="h-10 w-14 shrink-0 rounded-md object-cover bg-muted/50"
+                              />
+                            )}
+                            <div className="flex flex-col">
+                              <span className="font-semibold text-foreground group-hover:text-primary transition-colors duration-300">
+                                {vehicle.make} {vehicle.model}
+                              </span>
+                              <span className="text-xs text-muted-foreground">In Stock</span>
+                            </div>
                           </div>
                         </TableCell>
                         <TableCell className="hidden md:table-cell text-muted-foreground">
@@ -387,7 +494,7 @@ export default function VehicleDashboard({ initialPage, healthStatus }: VehicleD
               {totalPages > 1 && (
                 <div className="flex items-center justify-between pt-4 border-t border-border/30 animate-fade-in">
                   <p className="text-sm text-muted-foreground">
-                    Page {page} of {totalPages}
+                    Page {page} of {totalPages}{totalIsCapped ? "+" : ""}
                   </p>
                   <div className="flex items-center gap-2">
                     <Button
@@ -403,7 +510,7 @@ export default function VehicleDashboard({ initialPage, healthStatus }: VehicleD
                     <Button
                       variant="outline"
                       size="sm"
-                      disabled={page >= totalPages || isPageLoading}
+                      disabled={!hasNextPage || isPageLoading}
                       onClick={() => handlePageChange(page + 1, { resetStatus: true })}
                       className="hover:scale-105 transition-transform duration-200"
                     >
@@ -7,11 +7,13 @@ import { cn } from "@/lib/utils";
 
 interface VehicleGalleryProps {
   gallery: string[];
+  /** Smaller versions of `gallery` for the grid; the lightbox uses `gallery`. */
+  thumbnails?: string[];
   make: string;
   model: string;
 }
 
-export function VehicleGallery({ gallery, make, model }: VehicleGalleryProps) {
+export function VehicleGallery({ gallery, thumbnails, make, model }: VehicleGalleryProps) {
   const [selectedIndex, setSelectedIndex] = React.useState<number | null>(null);
   const isOpen = selectedIndex !== null;
 
@@ -76,8 +78,9 @@ export function VehicleGallery({ gallery, make, model }: VehicleGalleryProps) {
               style={{ animationDelay: `${index * 0.1}s` }}
             >
               <img
-                src={url}
+                src={thumbnails?.[index] ?? url}
                 alt={`${make} ${model} - Image ${index + 1}`}
+                loading="lazy"
                 className="aspect-video w-full object-cover transition-transform duration-500 group-hover:scale-110"
               />
               <div className="absolute inset-0 bg-gradient-to-t from-background/80 via-transparent to-transparent opacity-0 group-hover:opacity-100 transition-opacity duration-300 flex items-end p-4">
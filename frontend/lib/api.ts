@@ -2,8 +2,10 @@ import {
   HealthResponse,
   PaginatedVehicles,
   VehicleCreate,
+  VehicleFilters,
   VehicleListItem,
   VehicleOut,
+  VehicleSuggestResults,
 } from "./types";
 
 const RAW_BASE_URL =
@@ -14,16 +16,39 @@ const BASE_URL = RAW_BASE_URL.endsWith("/")
 
 const jsonHeaders = { "Content-Type": "application/json" };
 
+// After a write the backend returns a deadline (epoch seconds) until which this
+// client's reads must go to the primary database. Cookies don't reach a
+// cross-origin API, so the browser echoes the deadline back as a header.
+const READ_PRIMARY_HEADER = "X-Read-Primary-Until";
+let readPrimaryUntil: string | null = null;
+
+function readYourWritesHeaders(): Record<string, string> {
+  if (readPrimaryUntil === null) return {};
+  if (Number(readPrimaryUntil) * 1000 <= Date.now()) {
+    readPrimaryUntil = null;
+    return {};
+  }
+  return { [READ_PRIMARY_HEADER]: readPrimaryUntil };
+}
+
 async function request<T>(path: string, init?: RequestInit): Promise<T> {
   const response = await fetch(`${BASE_URL}${path}`, {
-    cache: "no-store",
+    // Revalidate with ETags instead of refetching: unchanged data comes back as a bodyless 304.
+    cache: "no-cache",
     ...init,
     headers: {
       ...jsonHeaders,
+      ...readYourWritesHeaders(),
       ...(init?.headers ?? {}),
     },
   });
 
+  // Only in the browser: on the server this module is shared by every visitor.
+  const until = response.headers.get(READ_PRIMARY_HEADER);
+  if (until && typeof window !== "undefined") {
+    readPrimaryUntil = until;
+  }
+
   if (!response.ok) {
     const message = await response.text();
     throw new Error(
@@ -45,12 +70,18 @@ export async function getHealth(): Promise<HealthResponse> {
 export async function listVehicles(params?: {
   page?: number;
   pageSize?: number;
+  filters?: VehicleFilters;
 }): Promise<PaginatedVehicles> {
   const search = new URLSearchParams();
   const page = params?.page ?? 1;
   const pageSize = params?.pageSize ?? 10;
   search.set("page", String(page));
   search.set("page_size", String(pageSize));
+  for (const [key, value] of Object.entries(params?.filters ?? {})) {
+    if (value !== undefined && value !== "") {
+      search.set(key, String(value));
+    }
+  }
   const query = search.toString();
   const path = `/api/vehicles?${query}`;
 
@@ -73,10 +104,22 @@ export async function listVehicles(params?: {
   return data;
 }
 
+/** Makes and models starting with `prefix`, served from the backend's in-memory index. */
+export async function suggestVehicles(prefix: string, limit = 8): Promise<VehicleSuggestResults> {
+  const search = new URLSearchParams({ prefix, limit: String(limit) });
+  return request<VehicleSuggestResults>(`/api/vehicles/suggest?${search}`);
+}
+
 export async function getVehicle(vin: string): Promise<VehicleOut> {
   return request<VehicleOut>(`/api/vehicles/${encodeURIComponent(vin)}`);
 }
 
+/** A vehicle photo served through the backend's image cache, scaled down to about `width` pixels. */
+export function vehicleImageUrl(vin: string, index: number, width?: number): string {
+  const query = width ? `?w=${width}` : "";
+  return `${BASE_URL}/api/images/${encodeURIComponent(vin)}/${index}${query}`;
+}
+
 export async function createVehicle(
   payload: VehicleCreate
 ): Promise<VehicleOut> {
@@ -85,3 +128,34 @@ export async function createVehicle(
     body: JSON.stringify(payload),
   });
 }
+
+/**
+ * Calls `onChange` whenever inventory changes on the server, via Server-Sent Events.
+ * Bursts (bulk loads, seeding) are coalesced into one call. Returns an unsubscribe function.
+ */
+export function subscribeToVehicleChanges(
+  onChange: () => void,
+  debounceMs = 250
+): () => void {
+  const source = new EventSource(`${BASE_URL}/api/vehicles/stream`);
+  let timer: ReturnType<typeof setTimeout> | undefined;
+  let opened = false;
+
+  const schedule = () => {
+    clearTimeout(timer);
+    timer = setTimeout(onChange, debounceMs);
+  };
+
+  source.addEventListener("vehicles", schedule);
+  source.addEventListener("resync", schedule);
+  source.onopen = () => {
+    // Nothing is replayed across a reconnect, so assume something changed meanwhile.
+    if (opened) schedule();
+    opened = true;
+  };
+
+  return () => {
+    clearTimeout(timer);
+    source.close();
+  };
+}
@@ -10,23 +10,68 @@ export interface VehicleCreate {
   model: string;
   description: string;
   image_urls: string[];
+  year?: number | null;
+  price?: number | null;
+  mileage?: number | null;
+  trim?: string | null;
+  exterior_color?: string | null;
+  interior_color?: string | null;
+  fuel_type?: string | null;
+  transmission?: string | null;
 }
 
 export interface VehicleListItem {
   vin: string;
   make: string;
   model: string;
+  year?: number | null;
+  price?: number | null;
+  mileage?: number | null;
   created_at?: ISODateString | null;
+  /** First of the vehicle's image URLs, if it has any. */
+  cover_image?: string | null;
 }
 
 export interface VehicleOut extends VehicleCreate {
   created_at?: ISODateString | null;
 }
 
+export interface VehicleFilters {
+  make?: string;
+  model?: string;
+  trim?: string;
+  exterior_color?: string;
+  interior_color?: string;
+  fuel_type?: string;
+  transmission?: string;
+  min_year?: number;
+  max_year?: number;
+  min_price?: number;
+  max_price?: number;
+  min_mileage?: number;
+  max_mileage?: number;
+}
+
 export interface PaginatedVehicles {
   items: VehicleListItem[];
   total: number;
+  /** Filtered totals stop counting at a cap; when true, `total` and `total_pages` are lower bounds. */
+  total_is_capped?: boolean;
   page: number;
   page_size: number;
   total_pages: number;
+  next_cursor?: string | null;
+  prev_cursor?: string | null;
+}
+
+export interface VehicleSuggestion {
+  make: string;
+  /** Null when the suggestion is the make as a whole. */
+  model: string | null;
+  count: number;
+}
+
+export interface VehicleSuggestResults {
+  prefix: string;
+  suggestions: VehicleSuggestion[];
 }